@@ -0,0 +1,4 @@
+import time
+
+# Marca o início dos imports da aplicação para o relatório de inicialização
+IMPORTS_STARTED = time.perf_counter()
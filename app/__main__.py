@@ -0,0 +1,5 @@
+import sys
+
+from app.interface.cli.main import main
+
+sys.exit(main())
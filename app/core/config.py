@@ -1,5 +1,5 @@
 import os
-from typing import List
+from typing import List, Literal
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -26,10 +26,19 @@ class Settings(BaseSettings):
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 12
     REPORT_EMAIL: str = ""
 
+    # Exige token do Keycloak nas rotas com tenant; o tenant vem da claim
+    # KEYCLOAK_TENANT_CLAIM e não mais só do header X-Tenant-ID
+    AUTH_ENABLED: bool = False
     KEYCLOAK_CLIENT_ID: str = ""
     KEYCLOAK_REALM_NAME: str = ""
     KEYCLOAK_SERVER_URL: str = ""
     KEYCLOAK_CLIENT_SECRET_KEY: str = ""
+    KEYCLOAK_JWKS_URL: str = ""
+    KEYCLOAK_AUDIENCE: str = ""
+    KEYCLOAK_TENANT_CLAIM: str = "tenant_id"
+    KEYCLOAK_JWKS_REFRESH_SECONDS: int = 300
+    KEYCLOAK_JWKS_MIN_REFRESH_SECONDS: int = 10
+    KEYCLOAK_TOKEN_CACHE_SIZE: int = 10000
 
     S3_ACCESS_KEY: str = ""
     S3_SECRET_KEY: str = ""
@@ -37,6 +46,30 @@ class Settings(BaseSettings):
 
     LOGGING_LEVEL: str = "INFO"
     GLOBAL_RATE_LIMIT: int = 100
+    SLOW_API_THRESHOLD: float = 5.0
+
+    SERVER_HOST: str = "0.0.0.0"
+    SERVER_PORT: int = 5000
+    # 0 = um worker por CPU disponível
+    SERVER_WORKERS: int = 0
+    SERVER_BACKLOG: int = 2048
+    SERVER_MAX_REQUESTS: int = 0
+    SERVER_MAX_REQUESTS_JITTER: int = 0
+    SERVER_MAX_RSS_MB: int = 0
+    SERVER_GRACEFUL_TIMEOUT_SECONDS: int = 30
+    SERVER_KEEP_ALIVE_SECONDS: int = 5
+    # Worker que morre com erro antes desse tempo conta como falha de startup
+    SERVER_MIN_WORKER_UPTIME_SECONDS: float = 5.0
+    SERVER_RESPAWN_BACKOFF_SECONDS: float = 0.5
+    SERVER_RESPAWN_MAX_BACKOFF_SECONDS: float = 30.0
+    # Falhas de startup seguidas até o mestre desistir e sair com erro
+    SERVER_CRASH_LOOP_LIMIT: int = 5
+
+    TELEMETRY_WORKERS: int = 2
+    TELEMETRY_QUEUE_SIZE: int = 1000
+    # drop_lowest: descarta logs para abrir espaço a alertas; drop_new: descarta a nova tarefa
+    TELEMETRY_OVERFLOW_POLICY: Literal["drop_lowest", "drop_new"] = "drop_lowest"
+    TELEMETRY_DRAIN_TIMEOUT_SECONDS: float = 10.0
 
     OPENSEARCH_URL: str = ""
     OPENSEARCH_PORT: int = Field(9200, env="OPENSEARCH_PORT")
@@ -45,6 +78,102 @@ class Settings(BaseSettings):
         False, env="OPENSEARCH_CONECTION_WITH_AWS"
     )
 
+    TRACING_SERVER_TIMING: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0
+    # Exportação OTLP/JSON: arquivo JSON Lines e/ou coletor (ex.: http://localhost:4318/v1/traces)
+    TRACING_EXPORT_FILE: str = ""
+    TRACING_OTLP_ENDPOINT: str = ""
+    TRACING_EXPORT_BATCH_SIZE: int = 512
+    TRACING_EXPORT_INTERVAL_SECONDS: float = 5.0
+    TRACING_EXPORT_QUEUE_SIZE: int = 10000
+
+    # Arquivo gerado por app.infrastructure.adapters.geolocation_adapter.compile_database
+    GEOIP_DATABASE_PATH: str = ""
+    GEOIP_CACHE_SIZE: int = 4096
+    GEOIP_RELOAD_CHECK_SECONDS: float = 30.0
+
+    REDIS_TIMEOUT_SECONDS: float = 0.5
+    OPENSEARCH_TIMEOUT_SECONDS: float = 3.0
+    EMAIL_TIMEOUT_SECONDS: float = 10.0
+
+    # Chamadas acima de metade do timeout da dependência contam como lentas
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_WINDOW_SIZE: int = 20
+    CIRCUIT_BREAKER_MIN_CALLS: int = 5
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0
+
+    # "opensearch" grava direto; "redis_stream" publica num Redis Stream lido
+    # pelo worker "python -m app log-consumer"
+    LOG_TRANSPORT: Literal["opensearch", "redis_stream"] = "opensearch"
+    LOG_STREAM_KEY: str = "logs:stream"
+    LOG_STREAM_MAXLEN: int = 1000000
+    LOG_STREAM_BATCH_SIZE: int = 200
+    LOG_STREAM_FLUSH_INTERVAL_SECONDS: float = 0.5
+    LOG_CONSUMER_GROUP: str = "log-shippers"
+    LOG_CONSUMER_BATCH_SIZE: int = 1000
+    LOG_CONSUMER_BLOCK_MS: int = 5000
+    LOG_CONSUMER_CLAIM_IDLE_MS: int = 60000
+    # Entregas sem sucesso até a mensagem ir para o stream de dead-letter
+    LOG_CONSUMER_MAX_DELIVERIES: int = 5
+    # Pausa na leitura enquanto o OpenSearch está fora, dobrando até o máximo
+    LOG_CONSUMER_BACKOFF_SECONDS: float = 1.0
+    LOG_CONSUMER_MAX_BACKOFF_SECONDS: float = 60.0
+    LOG_DEAD_LETTER_STREAM: str = "logs:stream:dead-letter"
+
+    # Uso por tenant em hashes do Redis por janela de tempo
+    USAGE_ENABLED: bool = True
+    USAGE_BUCKET_SECONDS: int = 3600
+    USAGE_FLUSH_INTERVAL_SECONDS: float = 5.0
+    USAGE_RETENTION_DAYS: int = 400
+
+    # Token exigido (header X-Actuator-Token) nos endpoints administrativos do
+    # actuator; vazio desabilita esses endpoints
+    ACTUATOR_TOKEN: str = ""
+
+    # Monitor de atraso do event loop e captura das chamadas bloqueantes
+    LOOP_MONITOR_ENABLED: bool = True
+    LOOP_MONITOR_INTERVAL_SECONDS: float = 0.1
+    LOOP_LAG_THRESHOLD_SECONDS: float = 0.1
+    LOOP_MONITOR_MAX_HOTSPOTS: int = 50
+    LOOP_MONITOR_STACK_DEPTH: int = 20
+
+    # Diagnóstico de memória (tracemalloc) pelo actuator
+    MEMORY_MAX_SNAPSHOTS: int = 10
+    MEMORY_TRACEBACK_FRAMES: int = 1
+    # Amostragem: tracemalloc ligado SAMPLE_SECONDS a cada INTERVAL_SECONDS,
+    # num único worker por máquina (lock em MEMORY_SAMPLING_LOCK_FILE)
+    MEMORY_SAMPLING_ENABLED: bool = False
+    MEMORY_SAMPLE_SECONDS: float = 10.0
+    MEMORY_SAMPLE_INTERVAL_SECONDS: float = 300.0
+    MEMORY_SAMPLING_LOCK_FILE: str = "/tmp/fastapi-core-memory-sampling.lock"
+
+    # Agregados por minuto gravados no índice logs_rollup
+    ROLLUP_ENABLED: bool = True
+    ROLLUP_FLUSH_INTERVAL_SECONDS: float = 10.0
+    # Tempo após o fim do minuto esperando registros atrasados antes de gravar
+    ROLLUP_GRACE_SECONDS: float = 15.0
+    ROLLUP_SKETCH_ACCURACY: float = 0.01
+
+    # Limite adaptativo de requisições simultâneas (ajustado pela latência).
+    # Desligado por padrão: ao ligar, rajadas acima do limite passam a
+    # receber 503/429; calibre o limite inicial pela capacidade do worker
+    CONCURRENCY_LIMIT_ENABLED: bool = False
+    CONCURRENCY_INITIAL_LIMIT: int = 20
+    CONCURRENCY_MIN_LIMIT: int = 4
+    CONCURRENCY_MAX_LIMIT: int = 200
+    # Latência de curto prazo tolerada em relação à de longo prazo
+    CONCURRENCY_TOLERANCE: float = 2.0
+    CONCURRENCY_SMOOTHING: float = 0.2
+    CONCURRENCY_MAX_QUEUE: int = 100
+    CONCURRENCY_TENANT_MAX_QUEUE: int = 20
+    CONCURRENCY_MAX_QUEUE_SECONDS: float = 1.0
+    # Estatísticas de tenants sem requisições há esse tempo são descartadas
+    CONCURRENCY_TENANT_IDLE_SECONDS: float = 300.0
+
+    # Adapters do container criados já no startup (ex.: "redis_client,auth_port")
+    PREWARM_ADAPTERS: str = ""
+
     @property
     def schema_list(self) -> List[str]:
         return [s.strip() for s in self.SCHEMAS.split(",")]
@@ -53,6 +182,24 @@ class Settings(BaseSettings):
     def schema_list_without_public(self) -> List[str]:
         return [s for s in self.schema_list if s != "public_schema" and s != "public"]
 
+    @property
+    def prewarm_adapter_list(self) -> List[str]:
+        return [s.strip() for s in self.PREWARM_ADAPTERS.split(",") if s.strip()]
+
+    @property
+    def keycloak_issuer(self) -> str:
+        if not self.KEYCLOAK_SERVER_URL or not self.KEYCLOAK_REALM_NAME:
+            return ""
+        return f"{self.KEYCLOAK_SERVER_URL.rstrip('/')}/realms/{self.KEYCLOAK_REALM_NAME}"
+
+    @property
+    def keycloak_jwks_url(self) -> str:
+        if self.KEYCLOAK_JWKS_URL:
+            return self.KEYCLOAK_JWKS_URL
+        if not self.keycloak_issuer:
+            return ""
+        return f"{self.keycloak_issuer}/protocol/openid-connect/certs"
+
     class ConfigDict:
         env_prefix = "APP_"
         env_file = ".env"
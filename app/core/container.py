@@ -1,20 +1,77 @@
+import importlib
+
 from dependency_injector import containers, providers
 from fastapi import Request
 
 from app.core.config import settings
-from app.infrastructure.adapters.opensearch_adapter import OpenSearchAdapter
-from app.infrastructure.cache.redis import RedisClient
 from sqlalchemy.orm import Session
 
 
 def get_request_id(request: Request):
     return request.headers.get("X-Request-ID", None)
 
+
+def lazy(path: str):
+    """
+    Adia o import do adapter (boto3, opensearchpy, redis, jwcrypto...) até
+    o provider ser chamado pela primeira vez.
+    """
+    module_name, _, attr = path.rpartition(".")
+
+    def factory(*args, **kwargs):
+        return getattr(importlib.import_module(module_name), attr)(*args, **kwargs)
+
+    factory.__qualname__ = f"lazy({path})"
+    return factory
+
+
 # Container
 class Container(containers.DeclarativeContainer):
     config = providers.Configuration()
     db = providers.Dependency(instance_of=Session)
-    redis_client = providers.Singleton(RedisClient, redis_url=settings.REDIS_URL)
-    open_search_port = providers.Factory(
-        OpenSearchAdapter,
+    redis_client = providers.Singleton(
+        lazy("app.infrastructure.cache.redis.RedisClient"),
+        redis_url=settings.REDIS_URL,
+    )
+    # Singleton: o cliente do OpenSearch mantém um pool de conexões que é
+    # compartilhado pelo middleware, pelos rollups e pelo fallback do stream
+    open_search_port = providers.Singleton(
+        lazy("app.infrastructure.adapters.opensearch_adapter.OpenSearchAdapter"),
+    )
+    email_port = providers.Singleton(
+        lazy("app.infrastructure.adapters.email_adapter.EmailAdapter"),
+    )
+    auth_port = providers.Singleton(
+        lazy("app.infrastructure.adapters.keycloak_adapter.KeycloakJwksAdapter"),
+    )
+    telemetry_scheduler = providers.Singleton(
+        lazy("app.infrastructure.telemetry.scheduler.TelemetryScheduler"),
+    )
+    concurrency_limiter = providers.Singleton(
+        lazy("app.infrastructure.resilience.concurrency_limiter.AdaptiveConcurrencyLimiter"),
+    )
+    log_stream_port = providers.Singleton(
+        lazy("app.infrastructure.adapters.redis_stream_adapter.RedisStreamLogPublisher"),
+        redis_url=settings.REDIS_URL,
+        fallback_port=open_search_port,
+    )
+    usage_accountant = providers.Singleton(
+        lazy("app.infrastructure.telemetry.usage.UsageAccountant"),
+        redis_client=redis_client,
+    )
+    loop_monitor = providers.Singleton(
+        lazy("app.infrastructure.telemetry.loop_monitor.LoopLagMonitor"),
+    )
+    memory_profiler = providers.Singleton(
+        lazy("app.infrastructure.telemetry.memory.MemoryProfiler"),
+    )
+    rollup_aggregator = providers.Singleton(
+        lazy("app.infrastructure.telemetry.rollup.RollupAggregator"),
+        open_search_port=open_search_port,
+    )
+    route_policies = providers.Singleton(
+        lazy("app.middlewares.route_policy.RoutePolicyTable"),
+    )
+    geolocation_port = providers.Singleton(
+        lazy("app.infrastructure.adapters.geolocation_adapter.GeolocationAdapter"),
     )
@@ -23,6 +23,7 @@ class LogEntry(Base):
     response_body = Column(JSON, nullable=True)
     response_headers = Column(JSON, nullable=True)
     duration = Column(Float, nullable=True)
+    spans = Column(JSON, nullable=True)
     timestamp = Column(DateTime, nullable=False)
 
     def __repr__(self):
@@ -34,7 +35,7 @@ class LogEntry(Base):
             f"geolocation={self.geolocation}, session_id={self.session_id}, "
             f"response_status_code={self.response_status_code}, response_body={self.response_body}, "
             f"response_headers={self.response_headers}, duration={self.duration}, "
-            f"timestamp={self.timestamp}>"
+            f"spans={self.spans}, timestamp={self.timestamp}>"
         )
 
     def to_dict(self):
@@ -55,5 +56,6 @@ class LogEntry(Base):
             "response_body": self.response_body,
             "response_headers": self.response_headers,
             "duration": self.duration,
+            "spans": self.spans,
             "timestamp": self.timestamp,
         }
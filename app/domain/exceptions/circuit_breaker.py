@@ -0,0 +1,4 @@
+class CircuitOpenError(Exception):
+    def __init__(self, name: str):
+        super().__init__(f"Circuito '{name}' aberto: dependência indisponível")
+        self.name = name
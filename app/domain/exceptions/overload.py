@@ -0,0 +1,6 @@
+class OverloadedError(Exception):
+    def __init__(self, reason: str, status_code: int = 503, retry_after: int = 1):
+        super().__init__(f"Requisição rejeitada por sobrecarga: {reason}")
+        self.reason = reason
+        self.status_code = status_code
+        self.retry_after = retry_after
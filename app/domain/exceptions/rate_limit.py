@@ -0,0 +1,4 @@
+class RateLimitExceededError(Exception):
+    def __init__(self, limit: str):
+        super().__init__(f"Limite de requisições excedido: {limit}")
+        self.limit = limit
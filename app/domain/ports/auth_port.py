@@ -0,0 +1,7 @@
+from abc import ABC, abstractmethod
+
+
+class AuthPort(ABC):
+    @abstractmethod
+    async def verify_token(self, token: str) -> dict:
+        pass
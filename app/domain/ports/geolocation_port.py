@@ -0,0 +1,8 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class GeolocationPort(ABC):
+    @abstractmethod
+    def lookup(self, ip_address: str) -> Optional[dict]:
+        pass
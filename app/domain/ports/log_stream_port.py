@@ -0,0 +1,11 @@
+from abc import ABC, abstractmethod
+
+
+class LogStreamPort(ABC):
+    @abstractmethod
+    def publish(self, document: dict):
+        pass
+
+    @abstractmethod
+    def flush(self) -> int:
+        pass
@@ -1,4 +1,31 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+@dataclass
+class BulkResult:
+    """Resultado de um ``bulk``: quais documentos do lote não foram gravados."""
+
+    total: int
+    # Posição do documento no lote -> status HTTP da rejeição
+    rejected: Dict[int, int] = field(default_factory=dict)
+    # A requisição inteira falhou (OpenSearch fora, circuito aberto)
+    unavailable: bool = False
+
+    @property
+    def indexed(self) -> int:
+        return 0 if self.unavailable else self.total - len(self.rejected)
+
+    def retryable(self, position: int) -> bool:
+        """O documento não foi gravado por uma falha transitória."""
+        if self.unavailable:
+            return True
+        status = self.rejected.get(position)
+        return status is not None and (status == 429 or status >= 500)
+
+    def permanently_rejected(self, position: int) -> bool:
+        return position in self.rejected and not self.retryable(position)
 
 
 class OpenSearchPort(ABC):
@@ -6,6 +33,16 @@ class OpenSearchPort(ABC):
     def set(self, index: str, data: dict, mapping: dict = None):
         pass
 
+    @abstractmethod
+    def bulk(
+        self,
+        index: str,
+        documents: list,
+        mapping: dict = None,
+        timestamp_field: str = None,
+    ) -> BulkResult:
+        pass
+
     @abstractmethod
     def get(self, index: str, body: dict):
         pass
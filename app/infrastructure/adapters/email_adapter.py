@@ -6,7 +6,10 @@ from typing import Dict
 import httpx
 
 from app.core.config import settings
+from app.domain.exceptions.circuit_breaker import CircuitOpenError
 from app.domain.ports.email_port import EmailPort
+from app.infrastructure.resilience.circuit_breaker import get_breaker
+from app.infrastructure.telemetry import tracing
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,8 @@ class EmailAdapter(EmailPort):
         self.username = settings.EMAIL_USERNAME
         self.password = settings.EMAIL_PASSWORD
         self.from_addr = settings.EMAIL_FROM_ADDR
+        self.timeout = settings.EMAIL_TIMEOUT_SECONDS
+        self.breaker = get_breaker("smtp", slow_call_seconds=self.timeout / 2)
 
     def send_email(self, to: str, subject: str, body: str):
         msg = MIMEText(body.encode("utf-8"), "html", "utf-8")
@@ -26,24 +31,31 @@ class EmailAdapter(EmailPort):
         msg["To"] = to
 
         try:
-            with smtplib.SMTP_SSL(self.host, self.port) as server:
-                server.login(self.username, self.password)
-                server.sendmail(self.from_addr, to, msg.as_string())
-                print("Email enviado com sucesso!")
+            with tracing.span("smtp.send", tracing.KIND_CLIENT):
+                self.breaker.call(self._deliver, to, msg)
+            print("Email enviado com sucesso!")
+        except CircuitOpenError:
+            print(f"SMTP indisponível, email descartado: {subject}")
         except Exception as e:
             print(f"Erro ao enviar email: {e}")
 
+    def _deliver(self, to: str, msg: MIMEText):
+        with smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout) as server:
+            server.login(self.username, self.password)
+            server.sendmail(self.from_addr, to, msg.as_string())
+
     async def fetch_logo_and_theme(self, tenant: str) -> Dict[str, str]:
         try:
-            async with httpx.AsyncClient() as client:
-                logo_response = await client.get(
-                    f"http://localhost:8000/api/v1/admin/tenant/logo/{tenant}"
-                )
-                logo_url = logo_response.text.strip()
-                theme_response = await client.get(
-                    f"http://localhost:8000/api/v1/admin/tenant/theme/{tenant}?response_type=object"
-                )
-                theme = theme_response.json()
+            with tracing.span("http.get", tracing.KIND_CLIENT, tenant=tenant):
+                async with httpx.AsyncClient(headers=tracing.inject_headers()) as client:
+                    logo_response = await client.get(
+                        f"http://localhost:8000/api/v1/admin/tenant/logo/{tenant}"
+                    )
+                    logo_url = logo_response.text.strip()
+                    theme_response = await client.get(
+                        f"http://localhost:8000/api/v1/admin/tenant/theme/{tenant}?response_type=object"
+                    )
+                    theme = theme_response.json()
             return {"logo_url": logo_url, **theme}
         except Exception as e:
             logger.error(
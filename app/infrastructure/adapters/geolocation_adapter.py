@@ -0,0 +1,214 @@
+import bisect
+import csv
+import ipaddress
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from functools import lru_cache
+from typing import Optional
+
+from app.core.config import settings
+from app.domain.ports.geolocation_port import GeolocationPort
+
+logger = logging.getLogger(__name__)
+
+# Formato do arquivo (little-endian):
+#   cabeçalho: MAGIC, quantidade de faixas IPv4, quantidade de faixas IPv6
+#   IPv4: inícios uint32[n], fins uint32[n], latitudes float32[n], longitudes float32[n]
+#   IPv6: inícios 16 bytes[n], fins 16 bytes[n], latitudes float32[n], longitudes float32[n]
+MAGIC = b"GEOIPDB1"
+HEADER = struct.Struct("<8sII")
+IPV6_SIZE = 16
+
+
+class _Ipv6Column:
+    """Expõe um bloco de endereços IPv6 de 16 bytes como sequência para o bisect."""
+
+    def __init__(self, buffer: memoryview, count: int):
+        self._buffer = buffer
+        self._count = count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        offset = i * IPV6_SIZE
+        return self._buffer[offset:offset + IPV6_SIZE].tobytes()
+
+
+class _Table:
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self.stat = os.fstat(f.fileno())
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        magic, v4_count, v6_count = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"Arquivo de geolocalização inválido: {path}")
+
+        offset = HEADER.size
+        self.v4_starts, offset = _column(buffer, offset, v4_count, "I")
+        self.v4_ends, offset = _column(buffer, offset, v4_count, "I")
+        self.v4_lat, offset = _column(buffer, offset, v4_count, "f")
+        self.v4_lon, offset = _column(buffer, offset, v4_count, "f")
+        self.v6_starts = _Ipv6Column(buffer[offset:offset + v6_count * IPV6_SIZE], v6_count)
+        offset += v6_count * IPV6_SIZE
+        self.v6_ends = _Ipv6Column(buffer[offset:offset + v6_count * IPV6_SIZE], v6_count)
+        offset += v6_count * IPV6_SIZE
+        self.v6_lat, offset = _column(buffer, offset, v6_count, "f")
+        self.v6_lon, offset = _column(buffer, offset, v6_count, "f")
+
+    def lookup(self, ip) -> Optional[dict]:
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if ip.version == 4:
+            starts, ends, lat, lon, key = (
+                self.v4_starts, self.v4_ends, self.v4_lat, self.v4_lon, int(ip)
+            )
+        else:
+            starts, ends, lat, lon, key = (
+                self.v6_starts, self.v6_ends, self.v6_lat, self.v6_lon, ip.packed
+            )
+        i = bisect.bisect_right(starts, key) - 1
+        if i < 0 or key > ends[i]:
+            return None
+        # float32 guarda ~7 dígitos: 4 casas decimais (~11 m) bastam para IP
+        return {"lat": round(lat[i], 4), "lon": round(lon[i], 4)}
+
+
+def _column(buffer: memoryview, offset: int, count: int, typecode: str):
+    end = offset + count * 4
+    column = buffer[offset:end].cast(typecode)
+    if sys.byteorder != "little":
+        column = array(typecode, column)
+        column.byteswap()
+    return column, end
+
+
+class GeolocationAdapter(GeolocationPort):
+    """
+    Geolocalização offline: o arquivo de faixas de IP é mapeado em memória
+    (compartilhado entre os workers pelo page cache) e consultado por busca
+    binária. O arquivo é recarregado quando muda em disco.
+    """
+
+    def __init__(
+        self,
+        path: str = None,
+        cache_size: int = None,
+        reload_check_seconds: float = None,
+    ):
+        self.path = path or settings.GEOIP_DATABASE_PATH
+        self.reload_check_seconds = (
+            reload_check_seconds
+            if reload_check_seconds is not None
+            else settings.GEOIP_RELOAD_CHECK_SECONDS
+        )
+        self._table = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._cached_lookup = lru_cache(maxsize=cache_size or settings.GEOIP_CACHE_SIZE)(
+            self._lookup
+        )
+        self._reload_if_changed()
+
+    def lookup(self, ip_address: str) -> Optional[dict]:
+        if not ip_address:
+            return None
+        if time.monotonic() >= self._next_check:
+            self._reload_if_changed()
+        return self._cached_lookup(ip_address)
+
+    def _lookup(self, ip_address: str) -> Optional[dict]:
+        table = self._table
+        if table is None:
+            return None
+        try:
+            ip = ipaddress.ip_address(ip_address.strip())
+        except ValueError:
+            return None
+        return table.lookup(ip)
+
+    def _reload_if_changed(self):
+        with self._lock:
+            self._next_check = time.monotonic() + self.reload_check_seconds
+            try:
+                stat = os.stat(self.path)
+            except OSError:
+                if self._table is None:
+                    logger.warning(f"Base de geolocalização não encontrada: {self.path}")
+                return
+            current = self._table.stat if self._table else None
+            if current and (current.st_mtime_ns, current.st_size) == (
+                stat.st_mtime_ns,
+                stat.st_size,
+            ):
+                return
+            try:
+                # O mapeamento anterior é liberado quando não houver mais referências
+                self._table = _Table(self.path)
+            except (OSError, ValueError, struct.error) as e:
+                logger.error(f"Erro ao carregar base de geolocalização: {str(e)}")
+                return
+            self._cached_lookup.cache_clear()
+            logger.info(f"Base de geolocalização carregada de {self.path}")
+
+
+def compile_database(source: str, destination: str):
+    """
+    Gera o arquivo binário a partir de um CSV com as colunas
+    ``inicio,fim,latitude,longitude`` ou ``rede_cidr,latitude,longitude``.
+    """
+    v4, v6 = [], []
+    with open(source, newline="") as f:
+        for row in csv.reader(f):
+            if not row or row[0].startswith("#"):
+                continue
+            try:
+                if len(row) == 3:
+                    network = ipaddress.ip_network(row[0].strip(), strict=False)
+                    start, end = network.network_address, network.broadcast_address
+                    lat, lon = float(row[1]), float(row[2])
+                else:
+                    start = ipaddress.ip_address(row[0].strip())
+                    end = ipaddress.ip_address(row[1].strip())
+                    lat, lon = float(row[2]), float(row[3])
+            except ValueError:
+                continue  # cabeçalho ou linha inválida
+            (v4 if start.version == 4 else v6).append((int(start), int(end), lat, lon))
+
+    for ranges in (v4, v6):
+        ranges.sort()
+        for previous, current in zip(ranges, ranges[1:]):
+            if current[0] <= previous[1]:
+                raise ValueError(f"Faixas sobrepostas: {previous} e {current}")
+
+    tmp = f"{destination}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(v4), len(v6)))
+        _write_column(f, "I", [r[0] for r in v4])
+        _write_column(f, "I", [r[1] for r in v4])
+        _write_column(f, "f", [r[2] for r in v4])
+        _write_column(f, "f", [r[3] for r in v4])
+        f.write(b"".join(r[0].to_bytes(IPV6_SIZE, "big") for r in v6))
+        f.write(b"".join(r[1].to_bytes(IPV6_SIZE, "big") for r in v6))
+        _write_column(f, "f", [r[2] for r in v6])
+        _write_column(f, "f", [r[3] for r in v6])
+    # Troca atômica: os workers nunca leem um arquivo pela metade
+    os.replace(tmp, destination)
+
+
+def _write_column(f, typecode: str, values: list):
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    f.write(column.tobytes())
+
+
+if __name__ == "__main__":
+    compile_database(sys.argv[1], sys.argv[2])
@@ -0,0 +1,147 @@
+import asyncio
+import base64
+import binascii
+import json
+import logging
+import time
+from collections import OrderedDict
+
+import httpx
+from jwcrypto import jwk, jwt
+from jwcrypto.common import JWException
+
+from app.core.config import settings
+from app.domain.exceptions.auth import AuthenticationError
+from app.domain.ports.auth_port import AuthPort
+from app.infrastructure.telemetry import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class KeycloakJwksAdapter(AuthPort):
+    """
+    Valida tokens localmente com as chaves públicas (JWKS) do realm,
+    sem chamar o Keycloak a cada requisição.
+    """
+
+    def __init__(
+        self,
+        jwks_url: str = None,
+        issuer: str = None,
+        audience: str = None,
+        refresh_seconds: int = None,
+        min_refresh_seconds: int = None,
+        cache_size: int = None,
+    ):
+        self.jwks_url = jwks_url if jwks_url is not None else settings.keycloak_jwks_url
+        self.issuer = issuer if issuer is not None else settings.keycloak_issuer
+        self.audience = audience if audience is not None else settings.KEYCLOAK_AUDIENCE
+        self.refresh_seconds = (
+            refresh_seconds
+            if refresh_seconds is not None
+            else settings.KEYCLOAK_JWKS_REFRESH_SECONDS
+        )
+        self.min_refresh_seconds = (
+            min_refresh_seconds
+            if min_refresh_seconds is not None
+            else settings.KEYCLOAK_JWKS_MIN_REFRESH_SECONDS
+        )
+        self.cache_size = cache_size or settings.KEYCLOAK_TOKEN_CACHE_SIZE
+        self._keys = jwk.JWKSet()
+        self._fetched_at = 0.0
+        self._last_attempt = 0.0
+        self._refresh_task = None
+        self._claims_cache = OrderedDict()
+
+    async def verify_token(self, token: str) -> dict:
+        now = time.time()
+        cached = self._claims_cache.get(token)
+        if cached is not None:
+            claims, expires_at = cached
+            if expires_at > now:
+                self._claims_cache.move_to_end(token)
+                return claims
+            del self._claims_cache[token]
+
+        kid = self._get_kid(token)
+        if not self._fetched_at:
+            # Sem chaves ainda: com o JWKS fora do ar só tenta de novo após
+            # o intervalo mínimo, em vez de segurar cada requisição no timeout
+            if self._refreshing or now - self._last_attempt >= self.min_refresh_seconds:
+                await self.refresh_keys()
+        elif now - self._fetched_at > self.refresh_seconds:
+            # Mantém as chaves atuais enquanto o JWKS é atualizado em background
+            self._schedule_refresh()
+
+        key = self._keys.get_key(kid)
+        if key is None and now - self._last_attempt >= self.min_refresh_seconds:
+            # Chave rotacionada no Keycloak: busca o JWKS novamente
+            await self.refresh_keys()
+            key = self._keys.get_key(kid)
+        if key is None:
+            if not self._fetched_at:
+                raise AuthenticationError(
+                    "Serviço de autenticação indisponível", status_code=503
+                )
+            raise AuthenticationError("Chave de assinatura desconhecida")
+
+        claims = self._decode(token, key)
+        self._remember(token, claims)
+        return claims
+
+    async def refresh_keys(self):
+        self._schedule_refresh()
+        await asyncio.shield(self._refresh_task)
+
+    @property
+    def _refreshing(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    def _schedule_refresh(self):
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._fetch_keys())
+
+    async def _fetch_keys(self):
+        self._last_attempt = time.time()
+        try:
+            with tracing.span("http.get", tracing.KIND_CLIENT, url=self.jwks_url):
+                async with httpx.AsyncClient(
+                    timeout=5.0, headers=tracing.inject_headers()
+                ) as client:
+                    response = await client.get(self.jwks_url)
+                    response.raise_for_status()
+            self._keys = jwk.JWKSet.from_json(response.text)
+            self._fetched_at = time.time()
+        except Exception as e:
+            logger.error(f"Erro ao buscar JWKS em {self.jwks_url}: {str(e)}")
+
+    def _decode(self, token: str, key) -> dict:
+        check_claims = {"exp": None}
+        if self.issuer:
+            check_claims["iss"] = self.issuer
+        if self.audience:
+            check_claims["aud"] = self.audience
+        try:
+            decoded = jwt.JWT(
+                jwt=token, key=key, check_claims=check_claims, expected_type="JWS"
+            )
+            return json.loads(decoded.claims)
+        except (JWException, ValueError) as e:
+            raise AuthenticationError(f"Token inválido: {str(e)}")
+
+    def _remember(self, token: str, claims: dict):
+        self._claims_cache[token] = (claims, float(claims["exp"]))
+        while len(self._claims_cache) > self.cache_size:
+            self._claims_cache.popitem(last=False)
+
+    @staticmethod
+    def _get_kid(token: str) -> str:
+        try:
+            header = token.split(".", 1)[0]
+            header += "=" * (-len(header) % 4)
+            kid = json.loads(base64.urlsafe_b64decode(header)).get("kid")
+        except (ValueError, binascii.Error, AttributeError):
+            raise AuthenticationError("Token malformado")
+        if not kid:
+            raise AuthenticationError("Token sem identificador de chave")
+        return kid
@@ -1,9 +1,10 @@
 import datetime
-import boto3
 from opensearchpy import AuthorizationException, OpenSearch, RequestsHttpConnection
-from requests_aws4auth import AWS4Auth
-from app.domain.ports.opensearch_port import OpenSearchPort
+from app.domain.exceptions.circuit_breaker import CircuitOpenError
+from app.domain.ports.opensearch_port import BulkResult, OpenSearchPort
 from app.core.config import settings
+from app.infrastructure.resilience.circuit_breaker import get_breaker
+from app.infrastructure.telemetry import tracing
 
 OPENSEARCH_PORT = settings.OPENSEARCH_PORT
 OPENSEARCH_URL = settings.OPENSEARCH_URL
@@ -14,9 +15,15 @@ OPENSEARCH_CONECTION_WITH_AWS = settings.OPENSEARCH_CONECTION_WITH_AWS
 class OpenSearchAdapter(OpenSearchPort):
     def __init__(self):
         self.es = None
+        self.timeout = settings.OPENSEARCH_TIMEOUT_SECONDS
+        self.breaker = get_breaker("opensearch", slow_call_seconds=self.timeout / 2)
 
         try:
             if OPENSEARCH_CONECTION_WITH_AWS:
+                # boto3 só é necessário na conexão com a AWS
+                import boto3
+                from requests_aws4auth import AWS4Auth
+
                 session = boto3.Session(region_name="sa-east-1")
                 service = "es"
                 credentials = session.get_credentials()
@@ -33,6 +40,7 @@ class OpenSearchAdapter(OpenSearchPort):
                     use_ssl=True,
                     verify_certs=True,
                     connection_class=RequestsHttpConnection,
+                    timeout=self.timeout,
                 )
             else:
                 self.es = OpenSearch(
@@ -42,13 +50,15 @@ class OpenSearchAdapter(OpenSearchPort):
                             "port": OPENSEARCH_PORT,
                             "scheme": OPENSEARCH_SCHEME,
                         }
-                    ]
+                    ],
+                    timeout=self.timeout,
                 )
         except Exception as e:
             print(f"Não foi possível conectar ao OpenSearch: {e}")
-            print(
-                f"Usando AWS Auth com a região {session.region_name} e host {settings.OPENSEARCH_URL}"
-            )
+            if OPENSEARCH_CONECTION_WITH_AWS:
+                print(
+                    f"Usando AWS Auth com a região sa-east-1 e host {settings.OPENSEARCH_URL}"
+                )
 
     def create_index_if_not_exists(self, index_name: str, mapping: dict):
         if not self.es.indices.exists(index=index_name):
@@ -62,13 +72,13 @@ class OpenSearchAdapter(OpenSearchPort):
                 print(f"Erro ao criar índice '{index_name}': {e}")
 
     def set(self, index: str, data: dict, mapping: dict = None, nivel: str = "INFO"):
+        index = f"{index}_{datetime.datetime.now().strftime('%Y_%m_%d')}"
         try:
-            data["nivel"] = nivel
-            data["timestamp"] = datetime.datetime.now().isoformat()
-            index = f"{index}_{datetime.datetime.now().strftime('%Y_%m_%d')}"
-            self.create_index_if_not_exists(index, mapping)
-            data = {k: v for k, v in data.items() if v}
-            self.es.index(index=index, body=data)
+            with tracing.span("opensearch.index", tracing.KIND_CLIENT, index=index):
+                self.breaker.call(self._index, index, data, mapping, nivel)
+        except CircuitOpenError:
+            print(f"OpenSearch indisponível, documento descartado. Index: {index}")
+            return False
         except AuthorizationException as e:
             print("Erro ao salvar no OpenSearch:")
             print(f"Index: {index}")
@@ -83,7 +93,76 @@ class OpenSearchAdapter(OpenSearchPort):
             print(f"error_type: {error_type}")
             return False
 
+    def _index(self, index: str, data: dict, mapping: dict, nivel: str):
+        data["nivel"] = nivel
+        data["timestamp"] = datetime.datetime.now().isoformat()
+        self.create_index_if_not_exists(index, mapping)
+        data = {k: v for k, v in data.items() if v}
+        self.es.index(index=index, body=data)
+
+    def bulk(
+        self,
+        index: str,
+        documents: list,
+        mapping: dict = None,
+        timestamp_field: str = None,
+    ) -> BulkResult:
+        """
+        Grava vários documentos numa requisição. Com ``timestamp_field`` cada
+        documento vai para o índice do dia do próprio timestamp, não do dia
+        da gravação.
+        """
+        try:
+            with tracing.span(
+                "opensearch.bulk", tracing.KIND_CLIENT, index=index, documents=len(documents)
+            ):
+                return self.breaker.call(
+                    self._bulk, index, documents, mapping, timestamp_field
+                )
+        except CircuitOpenError:
+            print(f"OpenSearch indisponível, {len(documents)} documentos não gravados. Index: {index}")
+        except Exception as e:
+            print(f"Erro ao salvar lote no OpenSearch: {e}")
+            print(f"Index: {index}")
+            print(f"error_type: {type(e).__name__}")
+        return BulkResult(len(documents), unavailable=True)
+
+    def _bulk(
+        self, index: str, documents: list, mapping: dict, timestamp_field: str
+    ) -> BulkResult:
+        from opensearchpy import helpers
+
+        today = datetime.datetime.now().strftime("%Y_%m_%d")
+        created = set()
+        actions = []
+        for document in documents:
+            document = dict(document)
+            suffix = today
+            if timestamp_field and document.get(timestamp_field):
+                suffix = str(document[timestamp_field])[:10].replace("-", "_")
+            name = f"{index}_{suffix}"
+            if name not in created:
+                self.create_index_if_not_exists(name, mapping)
+                created.add(name)
+            action = {"_index": name}
+            # "_id" opcional torna a gravação idempotente
+            if "_id" in document:
+                action["_id"] = document.pop("_id")
+            action["_source"] = document
+            actions.append(action)
+
+        # streaming_bulk devolve um resultado por ação, na ordem do lote
+        rejected = {}
+        results = helpers.streaming_bulk(self.es, actions, raise_on_error=False)
+        for position, (ok, item) in enumerate(results):
+            if not ok:
+                rejected[position] = next(iter(item.values())).get("status", 500)
+        if rejected:
+            print(f"{len(rejected)} documentos rejeitados pelo OpenSearch. Index: {index}")
+        return BulkResult(len(documents), rejected)
+
     def get(self, index: str, body: dict):
         if not index.endswith("_*"):
             index = f"{index}_*"
-        return self.es.search(index=index, body=body)
+        with tracing.span("opensearch.search", tracing.KIND_CLIENT, index=index):
+            return self.breaker.call(self.es.search, index=index, body=body)
@@ -0,0 +1,383 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+import redis
+
+from app.core.config import settings
+from app.domain.exceptions.circuit_breaker import CircuitOpenError
+from app.domain.ports.log_stream_port import LogStreamPort
+from app.infrastructure.mappings.opensearch.log_entries import get_log_entries_mapping
+from app.infrastructure.resilience.circuit_breaker import get_breaker
+from app.infrastructure.telemetry import tracing
+
+logger = logging.getLogger(__name__)
+
+LOG_INDEX = "logs"
+DATA_FIELD = "data"
+
+
+def to_log_document(entry: dict, nivel: str = "INFO") -> dict:
+    # Mesmo formato gravado por OpenSearchAdapter.set, mantendo o horário da requisição
+    document = {
+        key: value.isoformat() if hasattr(value, "isoformat") else value
+        for key, value in entry.items()
+        if value
+    }
+    document["nivel"] = nivel
+    return document
+
+
+class RedisStreamLogPublisher(LogStreamPort):
+    """
+    Publica os logs num Redis Stream em vez de indexar no OpenSearch. As
+    entradas são acumuladas e enviadas num pipeline de ``XADD`` (por
+    tamanho do lote ou a cada ``flush_interval``). Com o Redis fora do ar o
+    lote vai direto para o OpenSearch pelo ``fallback_port``.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        fallback_port=None,
+        stream: str = None,
+        maxlen: int = None,
+        batch_size: int = None,
+        flush_interval: float = None,
+        timeout: float = None,
+    ):
+        timeout = settings.REDIS_TIMEOUT_SECONDS if timeout is None else timeout
+        self._redis = redis.Redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+        )
+        self.fallback_port = fallback_port
+        self.stream = stream or settings.LOG_STREAM_KEY
+        self.maxlen = maxlen or settings.LOG_STREAM_MAXLEN
+        self.batch_size = batch_size or settings.LOG_STREAM_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.LOG_STREAM_FLUSH_INTERVAL_SECONDS
+        self.breaker = get_breaker("redis_stream", slow_call_seconds=timeout / 2)
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self.published = 0
+        self.fallbacks = 0
+
+    def publish(self, document: dict):
+        with self._lock:
+            self._buffer.append(to_log_document(document))
+            pending = len(self._buffer)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="log-stream-publisher", daemon=True
+                )
+                self._thread.start()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                return 0
+            try:
+                with tracing.span("redis.xadd", tracing.KIND_CLIENT, entries=len(batch)):
+                    self.breaker.call(self._xadd, batch)
+            except Exception as e:
+                if not isinstance(e, CircuitOpenError):
+                    logger.error(f"Falha ao publicar {len(batch)} logs no stream: {str(e)}")
+                return self._fallback(batch)
+            self.published += len(batch)
+            return len(batch)
+
+    def shutdown(self):
+        self.flush()
+
+    def _xadd(self, batch: list):
+        pipeline = self._redis.pipeline(transaction=False)
+        for document in batch:
+            pipeline.xadd(
+                self.stream,
+                {DATA_FIELD: json.dumps(document, default=str)},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        pipeline.execute()
+
+    def _fallback(self, batch: list) -> int:
+        if self.fallback_port is None:
+            logger.error(f"{len(batch)} logs descartados: stream indisponível")
+            return 0
+        self.fallbacks += len(batch)
+        return self.fallback_port.bulk(
+            LOG_INDEX, batch, get_log_entries_mapping(), timestamp_field="timestamp"
+        ).indexed
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Erro ao publicar logs no stream")
+
+
+class RedisStreamLogConsumer:
+    """
+    Worker que lê o stream de logs num consumer group e grava em lotes no
+    OpenSearch. Cada mensagem só recebe ``XACK`` depois de indexada (ou
+    rejeitada em definitivo); as que falham por erro transitório ficam
+    pendentes e são retomadas com ``XAUTOCLAIM``. O ``_id`` de cada
+    documento é o id da mensagem, então reprocessar não duplica documentos.
+
+    Mensagens rejeitadas pelo OpenSearch (ex.: conflito de mapping) ou que
+    já foram entregues ``max_deliveries`` vezes vão para o stream de
+    dead-letter, para não travar o consumidor. Com o OpenSearch inteiro
+    fora, a entrega não conta como tentativa da mensagem e o consumidor
+    pausa a leitura com backoff exponencial até um bulk funcionar.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        open_search_port,
+        stream: str = None,
+        group: str = None,
+        consumer: str = None,
+        batch_size: int = None,
+        block_ms: int = None,
+        claim_idle_ms: int = None,
+        max_deliveries: int = None,
+        dead_letter_stream: str = None,
+        backoff_seconds: float = None,
+        max_backoff_seconds: float = None,
+    ):
+        self._redis = redis.Redis.from_url(redis_url, decode_responses=True)
+        self.open_search_port = open_search_port
+        self.stream = stream or settings.LOG_STREAM_KEY
+        self.group = group or settings.LOG_CONSUMER_GROUP
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size or settings.LOG_CONSUMER_BATCH_SIZE
+        self.block_ms = settings.LOG_CONSUMER_BLOCK_MS if block_ms is None else block_ms
+        self.claim_idle_ms = claim_idle_ms or settings.LOG_CONSUMER_CLAIM_IDLE_MS
+        self.max_deliveries = max_deliveries or settings.LOG_CONSUMER_MAX_DELIVERIES
+        self.dead_letter_stream = dead_letter_stream or settings.LOG_DEAD_LETTER_STREAM
+        self.backoff_seconds = backoff_seconds or settings.LOG_CONSUMER_BACKOFF_SECONDS
+        self.max_backoff_seconds = (
+            max_backoff_seconds or settings.LOG_CONSUMER_MAX_BACKOFF_SECONDS
+        )
+        self.stopping = threading.Event()
+        self._next_reclaim = 0.0
+        self._backoff = 0.0
+        self._resume_at = 0.0
+        self.indexed = 0
+        self.acked = 0
+        self.discarded = 0
+        self.dead_lettered = 0
+
+    def ensure_group(self):
+        try:
+            self._redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def run(self):
+        self.ensure_group()
+        logger.info(
+            f"Consumidor {self.consumer} lendo {self.stream} no grupo {self.group}"
+        )
+        group_missing = False
+        while not self.stopping.is_set():
+            if self.paused:
+                # OpenSearch fora: não lê nem reassume mensagens até a próxima tentativa
+                self.stopping.wait(self._resume_at - time.monotonic())
+                continue
+            try:
+                if group_missing:
+                    self.ensure_group()
+                    group_missing = False
+                if time.monotonic() >= self._next_reclaim:
+                    self.reclaim()
+                    self._next_reclaim = time.monotonic() + self.claim_idle_ms / 2000
+                self.poll()
+            except redis.ConnectionError as e:
+                logger.error(f"Redis indisponível, tentando novamente: {str(e)}")
+                self.stopping.wait(1.0)
+            except redis.ResponseError as e:
+                if "NOGROUP" in str(e):
+                    # Stream ou grupo apagado (ex.: reset do stream): recria
+                    logger.warning(f"Grupo {self.group} não existe em {self.stream}, recriando")
+                    group_missing = True
+                    continue
+                logger.error(f"Erro do Redis ao ler {self.stream}: {str(e)}")
+                self.stopping.wait(1.0)
+
+    def stop(self):
+        self.stopping.set()
+
+    @property
+    def paused(self) -> bool:
+        return time.monotonic() < self._resume_at
+
+    def poll(self) -> int:
+        response = self._redis.xreadgroup(
+            self.group,
+            self.consumer,
+            {self.stream: ">"},
+            count=self.batch_size,
+            block=self.block_ms or None,
+        )
+        if not response:
+            return 0
+        _, messages = response[0]
+        return self.process(messages)
+
+    def reclaim(self) -> int:
+        """Assume as mensagens pendentes há mais de ``claim_idle_ms``."""
+        processed = 0
+        start_id = "0-0"
+        while True:
+            result = self._redis.xautoclaim(
+                self.stream,
+                self.group,
+                self.consumer,
+                self.claim_idle_ms,
+                start_id=start_id,
+                count=self.batch_size,
+            )
+            start_id, messages = result[0], result[1]
+            if messages:
+                processed += self.process(messages)
+            if start_id == "0-0" or not messages or self.paused:
+                return processed
+
+    def process(self, messages: list) -> int:
+        """Indexa o lote e retorna quantas mensagens receberam ack."""
+        done = []
+        documents = []
+        for message_id, fields in messages:
+            try:
+                document = json.loads(fields[DATA_FIELD])
+            except (KeyError, TypeError, ValueError):
+                # Mensagem inválida nunca vai ser indexada: descarta
+                self.discarded += 1
+                logger.error(f"Mensagem {message_id} inválida descartada do stream")
+                done.append(message_id)
+                continue
+            document["_id"] = message_id
+            documents.append(document)
+
+        dead = []
+        retry = []
+        if documents:
+            # Índice do dia da requisição: uma mensagem atrasada não vai para o dia do consumo
+            result = self.open_search_port.bulk(
+                LOG_INDEX, documents, get_log_entries_mapping(), timestamp_field="timestamp"
+            )
+            if result.unavailable:
+                self._uncount([d["_id"] for d in documents])
+                self._back_off()
+                logger.error(
+                    f"OpenSearch indisponível, {len(documents)} logs ficam pendentes;"
+                    f" leitura pausada por {self._backoff:.1f}s"
+                )
+                documents = []
+            else:
+                self._backoff = self._resume_at = 0.0
+            self.indexed += result.indexed
+            for position, document in enumerate(documents):
+                if result.retryable(position):
+                    retry.append(document)
+                elif result.permanently_rejected(position):
+                    dead.append((document, f"rejeitado: {result.rejected[position]}"))
+                else:
+                    done.append(document["_id"])
+
+        if retry:
+            deliveries = self._deliveries([d["_id"] for d in retry])
+            pending = 0
+            for document in retry:
+                count = deliveries.get(document["_id"], 0)
+                if count >= self.max_deliveries:
+                    dead.append((document, f"{count} entregas sem sucesso"))
+                else:
+                    pending += 1
+            if pending:
+                # Sem ack: as mensagens voltam pelo XAUTOCLAIM
+                logger.error(
+                    f"OpenSearch não gravou {pending} logs, ficam pendentes para nova tentativa"
+                )
+
+        if dead:
+            self._dead_letter(dead)
+        if done:
+            self._redis.xack(self.stream, self.group, *done)
+            self.acked += len(done)
+        return len(done) + len(dead)
+
+    def _deliveries(self, ids: list) -> dict:
+        pipeline = self._redis.pipeline(transaction=False)
+        for message_id in ids:
+            pipeline.xpending_range(
+                self.stream, self.group, min=message_id, max=message_id, count=1
+            )
+        return {
+            entry["message_id"]: entry["times_delivered"]
+            for entries in pipeline.execute()
+            for entry in entries
+        }
+
+    def _uncount(self, ids: list):
+        # A entrega falhou pelo OpenSearch, não pela mensagem: XCLAIM com
+        # RETRYCOUNT devolve o contador de entregas ao valor anterior
+        by_count = {}
+        for message_id, count in self._deliveries(ids).items():
+            by_count.setdefault(max(0, count - 1), []).append(message_id)
+        pipeline = self._redis.pipeline(transaction=False)
+        for count, message_ids in by_count.items():
+            pipeline.xclaim(
+                self.stream,
+                self.group,
+                self.consumer,
+                0,
+                message_ids,
+                retrycount=count,
+                justid=True,
+            )
+        pipeline.execute()
+
+    def _back_off(self):
+        self._backoff = min(
+            self.max_backoff_seconds, self._backoff * 2 or self.backoff_seconds
+        )
+        self._resume_at = time.monotonic() + self._backoff
+
+    def _dead_letter(self, dead: list):
+        pipeline = self._redis.pipeline(transaction=True)
+        for document, reason in dead:
+            message_id = document.pop("_id")
+            pipeline.xadd(
+                self.dead_letter_stream,
+                {
+                    DATA_FIELD: json.dumps(document, default=str),
+                    "message_id": message_id,
+                    "reason": reason,
+                },
+                maxlen=settings.LOG_STREAM_MAXLEN,
+                approximate=True,
+            )
+            pipeline.xack(self.stream, self.group, message_id)
+            logger.error(f"Log {message_id} movido para {self.dead_letter_stream}: {reason}")
+        pipeline.execute()
+        self.dead_lettered += len(dead)
+        self.acked += len(dead)
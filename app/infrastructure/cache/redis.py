@@ -1,20 +1,110 @@
+import threading
+from collections import OrderedDict
+
 import redis
 
 from app.core.config import settings
+from app.infrastructure.resilience.circuit_breaker import get_breaker
+from app.infrastructure.telemetry import tracing
+
+FALLBACK_CACHE_SIZE = 1024
 
 
 class RedisClient:
-    def __init__(self, redis_url: str):
-        self._redis = redis.StrictRedis.from_url(redis_url, decode_responses=True)
+    def __init__(self, redis_url: str, timeout: float = None):
+        timeout = settings.REDIS_TIMEOUT_SECONDS if timeout is None else timeout
+        self._redis = redis.StrictRedis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+        )
+        self.breaker = get_breaker("redis", slow_call_seconds=timeout / 2)
+        # Últimos valores lidos, servidos enquanto o Redis estiver indisponível
+        self._last_values = OrderedDict()
+        self._lock = threading.Lock()
 
     def get(self, key: str) -> str:
-        return self._redis.get(key)
+        with tracing.span("redis.get", tracing.KIND_CLIENT):
+            return self.breaker.call(self._get, key, fallback=self._last_value(key))
 
     def set(self, key: str, value: str, expire: int = None):
-        self._redis.set(key, value, ex=expire)
+        with tracing.span("redis.set", tracing.KIND_CLIENT):
+            self.breaker.call(self._redis.set, key, value, ex=expire)
+        self._remember(key, value)
 
     def delete(self, key: str):
-        self._redis.delete(key)
+        with tracing.span("redis.delete", tracing.KIND_CLIENT):
+            self.breaker.call(self._redis.delete, key)
+        with self._lock:
+            self._last_values.pop(key, None)
+
+    def hincrby_many(self, increments: dict, expire: int = None, members: dict = None) -> dict:
+        """
+        Aplica ``{chave: {campo: valor}}`` com HINCRBY num único pipeline;
+        ``members`` (``{set: [membros]}``) recebe SADD no mesmo envio.
+        Retorna ``{chave: campos (ou membros)}`` recusados pelo Redis.
+        """
+        with tracing.span("redis.pipeline", tracing.KIND_CLIENT, keys=len(increments)):
+            return self.breaker.call(self._hincrby_many, increments, expire, members or {})
+
+    def hgetall_many(self, keys: list) -> list:
+        with tracing.span("redis.pipeline", tracing.KIND_CLIENT, keys=len(keys)):
+            return self.breaker.call(self._pipeline_read, "hgetall", keys)
+
+    def smembers_many(self, keys: list) -> list:
+        with tracing.span("redis.pipeline", tracing.KIND_CLIENT, keys=len(keys)):
+            return self.breaker.call(self._pipeline_read, "smembers", keys)
+
+    def _hincrby_many(self, increments: dict, expire: int, members: dict) -> dict:
+        pipeline = self._redis.pipeline(transaction=False)
+        # (chave, campos) de cada comando, na ordem dos resultados do
+        # pipeline; falha no EXPIRE não conta, os valores já foram gravados
+        commands = []
+        for key, fields in increments.items():
+            for field, amount in fields.items():
+                pipeline.hincrby(key, field, amount)
+                commands.append((key, [field]))
+            if expire:
+                pipeline.expire(key, expire)
+                commands.append(None)
+        for key, values in members.items():
+            pipeline.sadd(key, *values)
+            commands.append((key, values))
+            if expire:
+                pipeline.expire(key, expire)
+                commands.append(None)
+        failed = {}
+        for command, result in zip(commands, pipeline.execute(raise_on_error=False)):
+            if command is not None and isinstance(result, Exception):
+                key, fields = command
+                failed.setdefault(key, set()).update(fields)
+        return failed
+
+    def _pipeline_read(self, command: str, keys: list) -> list:
+        pipeline = self._redis.pipeline(transaction=False)
+        for key in keys:
+            getattr(pipeline, command)(key)
+        return pipeline.execute()
+
+    def _get(self, key: str) -> str:
+        value = self._redis.get(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
+    def _remember(self, key: str, value: str):
+        with self._lock:
+            self._last_values[key] = value
+            self._last_values.move_to_end(key)
+            if len(self._last_values) > FALLBACK_CACHE_SIZE:
+                self._last_values.popitem(last=False)
 
+    def _last_value(self, key: str):
+        def fallback(exc):
+            value = self._last_values.get(key)
+            if value is None:
+                raise exc
+            return value
 
-redis_client = RedisClient(settings.REDIS_URL)
+        return fallback
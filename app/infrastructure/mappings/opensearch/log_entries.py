@@ -40,6 +40,7 @@ def get_log_entries_mapping():
                 },
             },
             "response_status_code": {"type": "integer"},
+            "spans": {"type": "object"},
             "tenant_id": {"type": "keyword", "ignore_above": 256},
             "timestamp": {"type": "date"},
             "user_agent": {"type": "keyword", "ignore_above": 256},
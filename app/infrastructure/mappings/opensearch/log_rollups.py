@@ -0,0 +1,29 @@
+def get_log_rollups_mapping():
+    return {
+        "properties": {
+            "timestamp": {"type": "date"},
+            "interval_seconds": {"type": "integer"},
+            "worker": {"type": "keyword", "ignore_above": 256},
+            "tenant_id": {"type": "keyword", "ignore_above": 256},
+            "method": {"type": "keyword", "ignore_above": 256},
+            "route": {"type": "keyword", "ignore_above": 256},
+            "status": {"type": "integer"},
+            "count": {"type": "long"},
+            "errors": {"type": "long"},
+            "bytes_in": {"type": "long"},
+            "bytes_out": {"type": "long"},
+            "duration_ms": {
+                "type": "object",
+                "properties": {
+                    "sum": {"type": "double"},
+                    "min": {"type": "float"},
+                    "max": {"type": "float"},
+                    "p50": {"type": "float"},
+                    "p90": {"type": "float"},
+                    "p99": {"type": "float"},
+                },
+            },
+            # Guardado para combinar quantis entre minutos/workers, sem indexar
+            "latency_sketch": {"type": "object", "enabled": False},
+        }
+    }
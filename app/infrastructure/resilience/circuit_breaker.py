@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import deque
+
+from app.core.config import settings
+from app.domain.exceptions.circuit_breaker import CircuitOpenError
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Abre o circuito quando a taxa de erros ou de chamadas lentas na janela
+    recente passa do limite. Aberto, falha imediatamente; depois de
+    ``open_seconds`` libera chamadas de teste (half-open) e fecha de novo
+    se elas tiverem sucesso.
+
+    Cada mudança de estado abre uma nova geração: o resultado de uma chamada
+    só conta para a geração em que ela foi admitida, então uma chamada lenta
+    que termina depois da mudança de estado é ignorada.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slow_call_seconds: float = None,
+        failure_rate_threshold: float = None,
+        slow_call_rate_threshold: float = None,
+        window_size: int = None,
+        min_calls: int = None,
+        open_seconds: float = None,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.failure_rate_threshold = (
+            failure_rate_threshold or settings.CIRCUIT_BREAKER_FAILURE_RATE
+        )
+        self.slow_call_rate_threshold = (
+            slow_call_rate_threshold or settings.CIRCUIT_BREAKER_SLOW_CALL_RATE
+        )
+        self.window_size = window_size or settings.CIRCUIT_BREAKER_WINDOW_SIZE
+        self.min_calls = min_calls or settings.CIRCUIT_BREAKER_MIN_CALLS
+        self.open_seconds = (
+            open_seconds if open_seconds is not None else settings.CIRCUIT_BREAKER_OPEN_SECONDS
+        )
+        self.half_open_max_calls = half_open_max_calls
+        self.state = STATE_CLOSED
+        self._outcomes = deque(maxlen=self.window_size)
+        self._lock = threading.Lock()
+        self._opened_at = 0.0
+        self._probes = 0
+        self._generation = 0
+        self.rejected = 0
+        self.failures = 0
+        self.times_opened = 0
+
+    def call(self, fn, *args, fallback=None, **kwargs):
+        """
+        Executa ``fn`` protegida pelo circuito. Se o circuito estiver aberto
+        ou a chamada falhar, ``fallback(exc)`` é usado quando informado.
+        """
+        try:
+            generation = self._acquire()
+        except CircuitOpenError as exc:
+            if fallback is None:
+                raise
+            return fallback(exc)
+
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            self._record(generation, failed=True, elapsed=time.monotonic() - start)
+            if fallback is None:
+                raise
+            return fallback(exc)
+        self._record(generation, failed=False, elapsed=time.monotonic() - start)
+        return result
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            calls = len(self._outcomes)
+            failed = sum(1 for f, _ in self._outcomes if f)
+            slow = sum(1 for _, s in self._outcomes if s)
+            return {
+                "name": self.name,
+                "state": self._current_state(),
+                "calls_in_window": calls,
+                "failure_rate": failed / calls if calls else 0.0,
+                "slow_call_rate": slow / calls if calls else 0.0,
+                "slow_call_seconds": self.slow_call_seconds,
+                "failures": self.failures,
+                "rejected": self.rejected,
+                "times_opened": self.times_opened,
+            }
+
+    def _current_state(self) -> str:
+        if self.state == STATE_OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            return STATE_HALF_OPEN
+        return self.state
+
+    def _acquire(self) -> int:
+        with self._lock:
+            if self.state == STATE_OPEN:
+                if time.monotonic() - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name)
+                self._transition(STATE_HALF_OPEN)
+                self._probes = 0
+            if self.state == STATE_HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name)
+                self._probes += 1
+            return self._generation
+
+    def _record(self, generation: int, failed: bool, elapsed: float):
+        slow = self.slow_call_seconds is not None and elapsed > self.slow_call_seconds
+        with self._lock:
+            if failed:
+                self.failures += 1
+            if generation != self._generation:
+                # Admitida antes da última mudança de estado: resultado obsoleto
+                return
+            if self.state == STATE_HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if failed or slow:
+                    self._open()
+                else:
+                    self._transition(STATE_CLOSED)
+                    self._outcomes.clear()
+                return
+
+            self._outcomes.append((failed, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failure_rate = sum(1 for f, _ in self._outcomes if f) / calls
+            slow_rate = sum(1 for _, s in self._outcomes if s) / calls
+            if (
+                failure_rate >= self.failure_rate_threshold
+                or slow_rate >= self.slow_call_rate_threshold
+            ):
+                self._open()
+
+    def _open(self):
+        self._transition(STATE_OPEN)
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self.times_opened += 1
+
+    def _transition(self, state: str):
+        self.state = state
+        self._generation += 1
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """
+    Retorna o circuito compartilhado ``name``, criando-o na primeira chamada.
+    Pedir o mesmo circuito com outra configuração é erro: ela seria ignorada.
+    """
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **kwargs)
+            return breaker
+    conflicts = {
+        key: value
+        for key, value in kwargs.items()
+        if value is not None and getattr(breaker, key) != value
+    }
+    if conflicts:
+        raise ValueError(
+            f"Circuito '{name}' já registrado com outra configuração: {conflicts}"
+        )
+    return breaker
+
+
+def breakers_snapshot() -> list:
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.snapshot() for breaker in breakers]
@@ -0,0 +1,253 @@
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+
+from app.core.config import settings
+from app.domain.exceptions.overload import OverloadedError
+from app.infrastructure.telemetry import tracing
+
+REASON_QUEUE_FULL = "queue_full"
+REASON_TENANT_QUEUE_FULL = "tenant_queue_full"
+REASON_QUEUE_TIMEOUT = "queue_timeout"
+
+# Pesos das médias móveis da latência: curta reage em poucas requisições,
+# longa aproxima a latência sem carga
+SHORT_RTT_WEIGHT = 0.1
+LONG_RTT_WEIGHT = 0.002
+
+
+class _Waiter:
+    __slots__ = ("tenant", "future", "granted")
+
+    def __init__(self, tenant: str, future: asyncio.Future):
+        self.tenant = tenant
+        self.future = future
+        self.granted = False
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limita as requisições simultâneas do processo com um limite que se
+    ajusta pela latência observada (gradiente entre a latência de longo e de
+    curto prazo). Acima do limite as requisições esperam em filas por tenant
+    atendidas em rodízio, com tempo máximo de espera; filas cheias rejeitam
+    na hora com ``OverloadedError`` (429 para o tenant que excede a própria
+    fila, 503 para sobrecarga geral).
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = None,
+        min_limit: int = None,
+        max_limit: int = None,
+        tolerance: float = None,
+        smoothing: float = None,
+        max_queue: int = None,
+        tenant_max_queue: int = None,
+        max_queue_seconds: float = None,
+        tenant_idle_seconds: float = None,
+    ):
+        self.min_limit = min_limit or settings.CONCURRENCY_MIN_LIMIT
+        self.max_limit = max_limit or settings.CONCURRENCY_MAX_LIMIT
+        self.limit = float(initial_limit or settings.CONCURRENCY_INITIAL_LIMIT)
+        self.tolerance = tolerance or settings.CONCURRENCY_TOLERANCE
+        self.smoothing = smoothing or settings.CONCURRENCY_SMOOTHING
+        self.max_queue = (
+            settings.CONCURRENCY_MAX_QUEUE if max_queue is None else max_queue
+        )
+        self.tenant_max_queue = (
+            settings.CONCURRENCY_TENANT_MAX_QUEUE
+            if tenant_max_queue is None
+            else tenant_max_queue
+        )
+        self.max_queue_seconds = (
+            settings.CONCURRENCY_MAX_QUEUE_SECONDS
+            if max_queue_seconds is None
+            else max_queue_seconds
+        )
+        self.tenant_idle_seconds = (
+            settings.CONCURRENCY_TENANT_IDLE_SECONDS
+            if tenant_idle_seconds is None
+            else tenant_idle_seconds
+        )
+        self.inflight = 0
+        self.queued = 0
+        self.short_rtt = None
+        self.long_rtt = None
+        self.accepted = 0
+        self.rejected = {
+            REASON_QUEUE_FULL: 0,
+            REASON_TENANT_QUEUE_FULL: 0,
+            REASON_QUEUE_TIMEOUT: 0,
+        }
+        self._queues = OrderedDict()
+        self._tenants = {}
+        self._tenant_seen = {}
+        self._next_eviction = 0.0
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def slot(self, tenant: str):
+        with tracing.span("queue"):
+            await self.acquire(tenant)
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException:
+            self.release(tenant)
+            raise
+        self.release(tenant, time.monotonic() - start)
+
+    async def acquire(self, tenant: str):
+        with self._lock:
+            if self.inflight < int(self.limit) and not self.queued:
+                self._admit(tenant)
+                return
+            stats = self._tenant_stats(tenant)
+            if stats["queued"] >= self.tenant_max_queue:
+                raise self._reject(REASON_TENANT_QUEUE_FULL, tenant, 429)
+            if self.queued >= self.max_queue:
+                raise self._reject(REASON_QUEUE_FULL, tenant, 503)
+            waiter = _Waiter(tenant, asyncio.get_running_loop().create_future())
+            self._queues.setdefault(tenant, deque()).append(waiter)
+            stats["queued"] += 1
+            self.queued += 1
+
+        try:
+            await asyncio.wait({waiter.future}, timeout=self.max_queue_seconds)
+        except BaseException:
+            # Cliente desconectou enquanto esperava
+            with self._lock:
+                if not waiter.granted:
+                    self._dequeue(waiter)
+                    raise
+            self.release(tenant)
+            raise
+
+        with self._lock:
+            # A vaga pode ter sido concedida junto com o fim do prazo
+            if waiter.granted:
+                return
+            self._dequeue(waiter)
+            raise self._reject(REASON_QUEUE_TIMEOUT, tenant, 503)
+
+    def release(self, tenant: str, rtt: float = None):
+        with self._lock:
+            inflight_before = self.inflight
+            self.inflight -= 1
+            self._tenant_stats(tenant)["inflight"] -= 1
+            if rtt is not None:
+                self._update_limit(rtt, inflight_before)
+            while self.queued and self.inflight < int(self.limit):
+                self._grant(self._next_waiter())
+            self._evict_idle_tenants()
+
+    def retry_after(self) -> int:
+        # Estimativa do tempo para a fila atual escoar
+        rtt = self.short_rtt or self.max_queue_seconds
+        return max(1, math.ceil(rtt * (self.queued + 1) / max(1, int(self.limit))))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "limit": int(self.limit),
+                "min_limit": self.min_limit,
+                "max_limit": self.max_limit,
+                "inflight": self.inflight,
+                "queued": self.queued,
+                "short_rtt_ms": round(self.short_rtt * 1000, 3) if self.short_rtt else None,
+                "long_rtt_ms": round(self.long_rtt * 1000, 3) if self.long_rtt else None,
+                "accepted": self.accepted,
+                "rejected": dict(self.rejected),
+                "tenants": {tenant: dict(stats) for tenant, stats in self._tenants.items()},
+            }
+
+    def _tenant_stats(self, tenant: str) -> dict:
+        stats = self._tenants.get(tenant)
+        if stats is None:
+            stats = self._tenants[tenant] = {"inflight": 0, "queued": 0, "rejected": 0}
+        self._tenant_seen[tenant] = time.monotonic()
+        return stats
+
+    def _evict_idle_tenants(self):
+        # Varredura periódica: o mapa não cresce com cada tenant já visto
+        now = time.monotonic()
+        if now < self._next_eviction:
+            return
+        self._next_eviction = now + self.tenant_idle_seconds / 2
+        cutoff = now - self.tenant_idle_seconds
+        for tenant, seen in list(self._tenant_seen.items()):
+            stats = self._tenants[tenant]
+            if seen < cutoff and not stats["inflight"] and not stats["queued"]:
+                del self._tenants[tenant]
+                del self._tenant_seen[tenant]
+
+    def _admit(self, tenant: str):
+        self.inflight += 1
+        self.accepted += 1
+        self._tenant_stats(tenant)["inflight"] += 1
+
+    def _reject(self, reason: str, tenant: str, status_code: int) -> OverloadedError:
+        self.rejected[reason] += 1
+        self._tenant_stats(tenant)["rejected"] += 1
+        self._evict_idle_tenants()
+        return OverloadedError(reason, status_code, self.retry_after())
+
+    def _next_waiter(self) -> _Waiter:
+        # Rodízio entre tenants: um tenant com fila longa não passa na frente
+        tenant, queue = next(iter(self._queues.items()))
+        waiter = queue.popleft()
+        if queue:
+            self._queues.move_to_end(tenant)
+        else:
+            del self._queues[tenant]
+        self.queued -= 1
+        self._tenant_stats(tenant)["queued"] -= 1
+        return waiter
+
+    def _dequeue(self, waiter: _Waiter):
+        queue = self._queues.get(waiter.tenant)
+        if queue is None or waiter not in queue:
+            return
+        queue.remove(waiter)
+        if not queue:
+            del self._queues[waiter.tenant]
+        self.queued -= 1
+        self._tenant_stats(waiter.tenant)["queued"] -= 1
+
+    def _grant(self, waiter: _Waiter):
+        waiter.granted = True
+        self._admit(waiter.tenant)
+        future = waiter.future
+        future.get_loop().call_soon_threadsafe(_resolve, future)
+
+    def _update_limit(self, rtt: float, inflight: int):
+        if self.short_rtt is None:
+            self.short_rtt = self.long_rtt = rtt
+            return
+        self.short_rtt += SHORT_RTT_WEIGHT * (rtt - self.short_rtt)
+        self.long_rtt += LONG_RTT_WEIGHT * (rtt - self.long_rtt)
+        if self.long_rtt > 2 * self.short_rtt:
+            # A latência base caiu (ex.: cache aquecido): acompanha mais rápido
+            self.long_rtt *= 0.95
+
+        gradient = max(0.5, min(1.0, self.tolerance * self.long_rtt / self.short_rtt))
+        if gradient == 1.0 and inflight < self.limit / 2:
+            # Sem carga suficiente a latência não diz nada sobre o limite
+            return
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = min(
+            self.max_limit,
+            max(
+                self.min_limit,
+                (1 - self.smoothing) * self.limit + self.smoothing * new_limit,
+            ),
+        )
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
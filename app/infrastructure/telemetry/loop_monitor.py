@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Raiz do pacote "app": o ponto de bloqueio é o frame mais interno do nosso código
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+RECENT_LAGS = 1000
+
+
+class LoopLagMonitor:
+    """
+    Mede o atraso de agendamento do event loop com uma tarefa de heartbeat
+    e, quando o heartbeat atrasa mais que ``threshold``, uma thread de
+    vigia captura a pilha da thread do loop (``sys._current_frames``). As
+    capturas são agregadas por ponto de chamada, o que aponta as chamadas
+    bloqueantes (Redis síncrono, SMTP...) feitas dentro de código async.
+    """
+
+    def __init__(
+        self,
+        interval: float = None,
+        threshold: float = None,
+        max_hotspots: int = None,
+        stack_depth: int = None,
+    ):
+        self.interval = interval or settings.LOOP_MONITOR_INTERVAL_SECONDS
+        self.threshold = threshold or settings.LOOP_LAG_THRESHOLD_SECONDS
+        self.max_hotspots = max_hotspots or settings.LOOP_MONITOR_MAX_HOTSPOTS
+        self.stack_depth = stack_depth or settings.LOOP_MONITOR_STACK_DEPTH
+        self._lags = deque(maxlen=RECENT_LAGS)
+        self._hotspots = {}
+        self._stall_sites = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._task = None
+        self._watcher = None
+        self._loop_thread = None
+        self._last_beat = None
+        self.beats = 0
+        self.stalls = 0
+        self.max_lag = 0.0
+
+    def start(self):
+        """Inicia o monitor; deve ser chamado de dentro do event loop."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watcher = threading.Thread(target=self._watch, name="loop-lag-watcher", daemon=True)
+        self._watcher.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._watcher = None
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lags = sorted(self._lags)
+        return {
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "beats": self.beats,
+            "stalls": self.stalls,
+            "lag_ms": {
+                "p50": _percentile(lags, 0.5),
+                "p99": _percentile(lags, 0.99),
+                "max_recent": round(lags[-1] * 1000, 3) if lags else None,
+                "max": round(self.max_lag * 1000, 3),
+            },
+        }
+
+    def report(self, limit: int = 20) -> dict:
+        with self._lock:
+            hotspots = sorted(
+                (dict(site=site, **data) for site, data in self._hotspots.items()),
+                key=lambda h: h["total_lag_ms"],
+                reverse=True,
+            )
+        return {**self.metrics(), "hotspots": hotspots[:limit]}
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_beat = now
+            with self._lock:
+                self.beats += 1
+                self._lags.append(lag)
+                self.max_lag = max(self.max_lag, lag)
+                if lag >= self.threshold:
+                    self.stalls += 1
+                    # A duração real do bloqueio só é conhecida quando o loop volta
+                    for site in self._stall_sites:
+                        hotspot = self._hotspots.get(site)
+                        if hotspot is not None:
+                            hotspot["total_lag_ms"] = round(hotspot["total_lag_ms"] + lag * 1000, 3)
+                            hotspot["max_lag_ms"] = round(max(hotspot["max_lag_ms"], lag * 1000), 3)
+                self._stall_sites = set()
+
+    def _watch(self):
+        # Amostra a pilha várias vezes por bloqueio: sites com mais amostras
+        # são os que seguraram o loop por mais tempo
+        check_interval = self.threshold / 2
+        while not self._stop.wait(check_interval):
+            beat = self._last_beat
+            if beat is None or time.monotonic() - beat - self.interval < self.threshold:
+                continue
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            try:
+                self._capture(frame, beat)
+            except Exception:
+                logger.exception("Erro ao capturar a pilha do event loop")
+            finally:
+                del frame
+
+    def _capture(self, frame, beat: float):
+        stack = traceback.extract_stack(frame, limit=self.stack_depth)
+        site_frame = _blocking_site(stack)
+        site = f"{site_frame.filename}:{site_frame.lineno} {site_frame.name}"
+        with self._lock:
+            hotspot = self._hotspots.get(site)
+            if hotspot is None:
+                if len(self._hotspots) >= self.max_hotspots:
+                    return
+                hotspot = self._hotspots[site] = {
+                    "samples": 0,
+                    "stalls": 0,
+                    "total_lag_ms": 0.0,
+                    "max_lag_ms": 0.0,
+                    "stack": [f"{f.filename}:{f.lineno} {f.name}" for f in stack],
+                }
+            hotspot["samples"] += 1
+            hotspot["last_seen"] = time.time()
+            if site not in self._stall_sites and beat == self._last_beat:
+                hotspot["stalls"] += 1
+                self._stall_sites.add(site)
+        logger.warning(f"Event loop bloqueado em {site}")
+
+
+def _blocking_site(stack) -> traceback.FrameSummary:
+    for frame in reversed(stack):
+        if frame.filename.startswith(APP_ROOT) and frame.filename != __file__:
+            return frame
+    return stack[-1]
+
+
+def _percentile(values: list, q: float):
+    if not values:
+        return None
+    return round(values[int(q * (len(values) - 1))] * 1000, 3)
@@ -0,0 +1,243 @@
+import fcntl
+import itertools
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GROUP_BY = ("lineno", "filename", "traceback")
+SOURCE_MANUAL = "manual"
+SOURCE_SAMPLING = "sampling"
+
+# Alocações do próprio tracemalloc e do import system só poluem o relatório
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class SnapshotNotFound(KeyError):
+    pass
+
+
+class MemoryProfiler:
+    """
+    Diagnóstico de memória com tracemalloc: liga/desliga o rastreamento,
+    guarda os últimos snapshots e gera o ranking de alocações e a diferença
+    entre dois snapshots.
+
+    No modo de amostragem o tracemalloc fica ligado só ``sample_seconds`` a
+    cada ``interval_seconds`` e o snapshot do fim de cada janela é guardado:
+    mostra o que foi alocado na janela e continua vivo, com custo médio baixo
+    o bastante para ficar ligado num worker canário. Um lock de arquivo
+    garante um único worker amostrando por máquina.
+    """
+
+    def __init__(
+        self,
+        max_snapshots: int = None,
+        frames: int = None,
+        sample_seconds: float = None,
+        interval_seconds: float = None,
+        lock_file: str = None,
+    ):
+        self.max_snapshots = max_snapshots or settings.MEMORY_MAX_SNAPSHOTS
+        self.frames = frames or settings.MEMORY_TRACEBACK_FRAMES
+        self.sample_seconds = sample_seconds or settings.MEMORY_SAMPLE_SECONDS
+        self.interval_seconds = interval_seconds or settings.MEMORY_SAMPLE_INTERVAL_SECONDS
+        self.lock_file = settings.MEMORY_SAMPLING_LOCK_FILE if lock_file is None else lock_file
+        self._snapshots = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._sampling_stop = None
+        self._sampling_thread = None
+        self._lock_fd = None
+
+    # Rastreamento manual
+
+    def start(self, frames: int = None) -> dict:
+        self.stop_sampling()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames or self.frames)
+        return self.status()
+
+    def stop(self) -> dict:
+        self.stop_sampling()
+        tracemalloc.stop()
+        return self.status()
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        status = {
+            "pid": os.getpid(),
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit(),
+            "traced_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "tracemalloc_overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+            "sampling": self.sampling,
+            "snapshots": self.list_snapshots(),
+        }
+        try:
+            import psutil
+
+            status["rss_mb"] = round(psutil.Process().memory_info().rss / 1024 / 1024, 1)
+        except ImportError:
+            pass
+        return status
+
+    def take_snapshot(self, source: str = SOURCE_MANUAL) -> dict:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("tracemalloc não está ativo")
+        snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+        with self._lock:
+            snapshot_id = next(self._ids)
+            self._snapshots[snapshot_id] = {
+                "snapshot": snapshot,
+                "taken_at": time.time(),
+                "source": source,
+            }
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return self._describe(snapshot_id)
+
+    def list_snapshots(self) -> list:
+        with self._lock:
+            ids = list(self._snapshots)
+        return [self._describe(snapshot_id) for snapshot_id in ids]
+
+    def top(self, snapshot_id: int, group_by: str = "lineno", limit: int = 20) -> dict:
+        snapshot = self._get(snapshot_id)
+        stats = snapshot.statistics(self._key_type(group_by))
+        return {
+            **self._describe(snapshot_id),
+            "group_by": group_by,
+            "stats": [self._stat(stat) for stat in stats[:limit]],
+        }
+
+    def diff(
+        self, first_id: int, second_id: int, group_by: str = "lineno", limit: int = 20
+    ) -> dict:
+        first = self._get(first_id)
+        second = self._get(second_id)
+        stats = second.compare_to(first, self._key_type(group_by))
+        return {
+            "first": self._describe(first_id),
+            "second": self._describe(second_id),
+            "group_by": group_by,
+            "size_diff_kb": round(sum(s.size_diff for s in stats) / 1024, 1),
+            "stats": [self._stat_diff(stat) for stat in stats[:limit]],
+        }
+
+    # Amostragem
+
+    @property
+    def sampling(self) -> bool:
+        return self._sampling_thread is not None and self._sampling_thread.is_alive()
+
+    def start_sampling(self) -> bool:
+        if self.sampling:
+            return True
+        if not self._acquire_sampling_lock():
+            logger.info("Amostragem de memória ativa em outro worker")
+            return False
+        self._sampling_stop = threading.Event()
+        self._sampling_thread = threading.Thread(
+            target=self._sample, args=(self._sampling_stop,), name="memory-sampler", daemon=True
+        )
+        self._sampling_thread.start()
+        return True
+
+    def stop_sampling(self):
+        if not self.sampling:
+            return
+        self._sampling_stop.set()
+        self._sampling_thread.join()
+        self._sampling_thread = None
+        self._release_sampling_lock()
+
+    def _sample(self, stop: threading.Event):
+        while not stop.wait(max(0.0, self.interval_seconds - self.sample_seconds)):
+            tracemalloc.start(self.frames)
+            try:
+                if stop.wait(self.sample_seconds):
+                    return
+                self.take_snapshot(SOURCE_SAMPLING)
+            except Exception:
+                logger.exception("Erro na amostragem de memória")
+            finally:
+                tracemalloc.stop()
+
+    def _acquire_sampling_lock(self) -> bool:
+        if not self.lock_file:
+            return True
+        fd = os.open(self.lock_file, os.O_CREAT | os.O_RDWR, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _release_sampling_lock(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    # Auxiliares
+
+    def _get(self, snapshot_id: int) -> tracemalloc.Snapshot:
+        with self._lock:
+            entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise SnapshotNotFound(snapshot_id)
+        return entry["snapshot"]
+
+    def _describe(self, snapshot_id: int) -> dict:
+        with self._lock:
+            entry = self._snapshots[snapshot_id]
+        return {
+            "id": snapshot_id,
+            "taken_at": entry["taken_at"],
+            "source": entry["source"],
+            "traces": len(entry["snapshot"].traces),
+        }
+
+    @staticmethod
+    def _key_type(group_by: str) -> str:
+        if group_by not in GROUP_BY:
+            raise ValueError(f"group_by deve ser um de {', '.join(GROUP_BY)}")
+        return group_by
+
+    @staticmethod
+    def _location(traceback: tracemalloc.Traceback) -> dict:
+        frame = traceback[0]
+        location = {"file": frame.filename, "line": frame.lineno}
+        if len(traceback) > 1:
+            location["traceback"] = [f"{f.filename}:{f.lineno}" for f in traceback]
+        return location
+
+    def _stat(self, stat: tracemalloc.Statistic) -> dict:
+        return {
+            **self._location(stat.traceback),
+            "size_kb": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+
+    def _stat_diff(self, stat: tracemalloc.StatisticDiff) -> dict:
+        return {
+            **self._location(stat.traceback),
+            "size_kb": round(stat.size / 1024, 1),
+            "size_diff_kb": round(stat.size_diff / 1024, 1),
+            "count": stat.count,
+            "count_diff": stat.count_diff,
+        }
@@ -0,0 +1,40 @@
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Executa ``fn`` a cada ``interval`` segundos numa thread daemon.
+
+    A thread só é criada em ``ensure_started``, chamado no primeiro registro
+    de dados: com o preload do servidor a aplicação é carregada no processo
+    mestre, e uma thread iniciada antes do fork não existiria nos workers.
+    """
+
+    def __init__(self, fn, interval: float, name: str):
+        self.fn = fn
+        self.interval = interval
+        self.name = name
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None and not self._stop.is_set():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.fn()
+            except Exception:
+                logger.exception(f"Erro na tarefa periódica {self.name}")
@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+from app.core.config import settings
+from app.infrastructure.mappings.opensearch.log_rollups import get_log_rollups_mapping
+from app.infrastructure.telemetry.periodic import PeriodicTask
+from app.infrastructure.telemetry.sketch import DDSketch
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_INDEX = "logs_rollup"
+UNMATCHED_ROUTE = "unmatched"
+
+
+class _Bucket:
+    __slots__ = ("count", "errors", "bytes_in", "bytes_out", "latency", "part")
+
+    def __init__(self, part: str = ""):
+        self.count = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.latency = DDSketch(settings.ROLLUP_SKETCH_ACCURACY)
+        # Vazio no documento principal do minuto; único para registros atrasados
+        self.part = part
+
+    def merge(self, other: "_Bucket"):
+        self.count += other.count
+        self.errors += other.errors
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.latency.merge(other.latency)
+
+
+class RollupAggregator:
+    """
+    Agrega as requisições por minuto/tenant/rota/método/status (contagem,
+    erros, bytes e um DDSketch da latência) e grava um documento resumido
+    por grupo no índice ``logs_rollup``, no dia do próprio minuto.
+
+    Um minuto só é gravado ``grace_seconds`` depois de terminar. Registros
+    que chegam depois disso vão para um documento novo, com ``_id`` próprio,
+    em vez de sobrescrever o agregado já gravado; as consultas somam os
+    documentos do mesmo grupo.
+    """
+
+    def __init__(
+        self,
+        open_search_port,
+        flush_interval: float = None,
+        grace_seconds: float = None,
+    ):
+        self.open_search_port = open_search_port
+        self.grace_seconds = (
+            settings.ROLLUP_GRACE_SECONDS if grace_seconds is None else grace_seconds
+        )
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = PeriodicTask(
+            self.flush,
+            flush_interval or settings.ROLLUP_FLUSH_INTERVAL_SECONDS,
+            "rollup-flusher",
+        )
+        self.flushed = 0
+        self.failed = 0
+
+    def record(
+        self,
+        tenant: str,
+        method: str,
+        route: str,
+        status: int,
+        duration: float,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+        timestamp: float = None,
+    ):
+        with self._lock:
+            now = time.time()
+            minute = int((now if timestamp is None else timestamp) // 60) * 60
+            key = (minute, tenant or "anonymous", method, route or UNMATCHED_ROUTE, status)
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                late = now >= self._closes_at(minute)
+                bucket = self._buckets[key] = _Bucket(uuid.uuid4().hex if late else "")
+            bucket.count += 1
+            if status >= 400:
+                bucket.errors += 1
+            bucket.bytes_in += bytes_in
+            bucket.bytes_out += bytes_out
+            bucket.latency.add(duration * 1000)
+        self._flusher.ensure_started()
+
+    def flush(self, include_current: bool = False) -> int:
+        with self._flush_lock:
+            with self._lock:
+                now = time.time()
+                keys = [
+                    key
+                    for key in self._buckets
+                    if include_current or now >= self._closes_at(key[0])
+                ]
+                buckets = [(key, self._buckets.pop(key)) for key in keys]
+            if not buckets:
+                return 0
+
+            documents = [self._to_document(key, bucket) for key, bucket in buckets]
+            result = self.open_search_port.bulk(
+                ROLLUP_INDEX, documents, get_log_rollups_mapping(), timestamp_field="timestamp"
+            )
+            retry = [
+                (key, bucket)
+                for position, (key, bucket) in enumerate(buckets)
+                if result.retryable(position)
+            ]
+            dropped = result.total - result.indexed - len(retry)
+            self.flushed += result.indexed
+            self.failed += dropped
+            if retry:
+                logger.error(f"Falha ao gravar {len(retry)} rollups, nova tentativa no próximo ciclo")
+                self._restore(retry)
+            if dropped:
+                logger.error(f"{dropped} rollups rejeitados pelo OpenSearch foram descartados")
+            return result.indexed
+
+    def shutdown(self):
+        self._flusher.stop()
+        self.flush(include_current=True)
+
+    def _closes_at(self, minute: int) -> float:
+        return minute + 60 + self.grace_seconds
+
+    def _restore(self, buckets: list):
+        with self._lock:
+            for key, bucket in buckets:
+                current = self._buckets.get(key)
+                if current is None:
+                    self._buckets[key] = bucket
+                else:
+                    # Um registro atrasado abriu outro documento: junta os dois nele
+                    current.merge(bucket)
+
+    @staticmethod
+    def _to_document(key, bucket: _Bucket) -> dict:
+        minute, tenant, method, route, status = key
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+        timestamp = datetime.fromtimestamp(minute, timezone.utc).isoformat()
+        latency = bucket.latency
+        # Id determinístico: reenviar o mesmo documento sobrescreve em vez de duplicar
+        doc_id = hashlib.sha1(
+            f"{timestamp}|{worker}|{tenant}|{method}|{route}|{status}|{bucket.part}".encode()
+        ).hexdigest()
+        return {
+            "_id": doc_id,
+            "timestamp": timestamp,
+            "interval_seconds": 60,
+            "worker": worker,
+            "tenant_id": tenant,
+            "method": method,
+            "route": route,
+            "status": status,
+            "count": bucket.count,
+            "errors": bucket.errors,
+            "bytes_in": bucket.bytes_in,
+            "bytes_out": bucket.bytes_out,
+            "duration_ms": {
+                "sum": latency.sum,
+                "min": latency.min,
+                "max": latency.max,
+                "p50": latency.quantile(0.5),
+                "p90": latency.quantile(0.9),
+                "p99": latency.quantile(0.99),
+            },
+            "latency_sketch": latency.to_dict(),
+        }
@@ -0,0 +1,159 @@
+import contextvars
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ALERT = 0
+PRIORITY_LOG = 10
+PRIORITY_NAMES = {PRIORITY_ALERT: "alert", PRIORITY_LOG: "log"}
+
+OVERFLOW_DROP_NEW = "drop_new"
+OVERFLOW_DROP_LOWEST = "drop_lowest"
+
+
+class TelemetryScheduler:
+    """
+    Pool de threads próprio para tarefas de telemetria (logs no OpenSearch,
+    emails de alerta), isolado do threadpool que atende as requisições.
+    Quanto menor a prioridade, antes a tarefa é executada.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        max_queue: int = None,
+        overflow_policy: str = None,
+    ):
+        self.workers = workers or settings.TELEMETRY_WORKERS
+        self.max_queue = max_queue or settings.TELEMETRY_QUEUE_SIZE
+        self.overflow_policy = overflow_policy or settings.TELEMETRY_OVERFLOW_POLICY
+        if self.overflow_policy not in (OVERFLOW_DROP_NEW, OVERFLOW_DROP_LOWEST):
+            raise ValueError(f"Política de overflow inválida: {self.overflow_policy}")
+        self._queue = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._accepting = True
+        self._stopping = False
+        self._running = 0
+        self._max_depth = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._dropped = {}
+
+    def submit(self, fn, *args, priority: int = PRIORITY_LOG, **kwargs) -> bool:
+        with self._cond:
+            if not self._accepting:
+                self._count_drop(priority)
+                return False
+            if not self._threads:
+                self._start_workers()
+            if len(self._queue) >= self.max_queue and not self._make_room(priority):
+                self._count_drop(priority)
+                return False
+            # O contexto acompanha a tarefa (ex.: spans do trace da requisição)
+            context = contextvars.copy_context()
+            heapq.heappush(
+                self._queue, (priority, next(self._seq), context, fn, args, kwargs)
+            )
+            self._submitted += 1
+            self._max_depth = max(self._max_depth, len(self._queue))
+            self._cond.notify()
+        return True
+
+    def shutdown(self, timeout: float = None) -> int:
+        """
+        Para de aceitar tarefas e aguarda a fila esvaziar até ``timeout``.
+        Retorna quantas tarefas foram descartadas.
+        """
+        timeout = settings.TELEMETRY_DRAIN_TIMEOUT_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._accepting = False
+            while self._queue or self._running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            pending = len(self._queue)
+            for priority, *_ in self._queue:
+                self._count_drop(priority)
+            self._queue.clear()
+            self._stopping = True
+            self._cond.notify_all()
+
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+        if pending:
+            logger.warning(f"{pending} tarefas de telemetria descartadas no shutdown")
+        return pending
+
+    def metrics(self) -> dict:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "queue_depth": len(self._queue),
+                "queue_max_depth": self._max_depth,
+                "queue_capacity": self.max_queue,
+                "running": self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "dropped": dict(self._dropped),
+            }
+
+    def _start_workers(self):
+        for i in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f"telemetry-{i}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _make_room(self, priority: int) -> bool:
+        if self.overflow_policy != OVERFLOW_DROP_LOWEST:
+            return False
+        # Descarta a tarefa menos prioritária (e mais recente) se for pior que a nova
+        worst = max(self._queue)
+        if worst[0] <= priority:
+            return False
+        self._queue.remove(worst)
+        heapq.heapify(self._queue)
+        self._count_drop(worst[0])
+        return True
+
+    def _count_drop(self, priority: int):
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        self._dropped[name] = self._dropped.get(name, 0) + 1
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                _, _, context, fn, args, kwargs = heapq.heappop(self._queue)
+                self._running += 1
+
+            failed = False
+            try:
+                context.run(fn, *args, **kwargs)
+            except Exception:
+                failed = True
+                logger.exception("Erro ao executar tarefa de telemetria")
+
+            with self._cond:
+                self._running -= 1
+                if failed:
+                    self._failed += 1
+                else:
+                    self._completed += 1
+                self._cond.notify_all()
@@ -0,0 +1,313 @@
+import json
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Valores de SpanKind do OTLP
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "trace",
+        "name",
+        "span_id",
+        "parent_id",
+        "kind",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "error",
+    )
+
+    def __init__(self, trace, name: str, parent_id: str = None, kind: int = KIND_INTERNAL, attributes=None):
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes or {}
+        self.error = False
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def end(self, error: bool = False):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        self.error = self.error or error
+        self.trace.on_end(self)
+
+
+class RequestTrace:
+    """
+    Spans de uma requisição. Guarda a duração de cada fase para o LogEntry e
+    o header Server-Timing, e envia os spans amostrados ao exportador.
+    """
+
+    def __init__(self, name: str, traceparent: str = None):
+        parent = parse_traceparent(traceparent)
+        if parent:
+            self.trace_id, parent_id, self.sampled = parent
+        else:
+            self.trace_id = f"{random.getrandbits(128):032x}"
+            parent_id = None
+            self.sampled = random.random() < settings.TRACING_SAMPLE_RATE
+        self.durations = {}
+        self.root = Span(self, name, parent_id, KIND_SERVER)
+        self._token = _current_span.set(self.root)
+
+    def on_end(self, span: Span):
+        if span is not self.root:
+            self.durations[span.name] = self.durations.get(span.name, 0.0) + span.duration_ms
+        if self.sampled and exporter.enabled:
+            exporter.add(span)
+
+    def phase_durations(self) -> dict:
+        durations = {name: round(ms, 3) for name, ms in self.durations.items()}
+        durations["total"] = round(self.root.duration_ms, 3)
+        return durations
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f"{name.replace('.', '_')};dur={ms}" for name, ms in self.phase_durations().items()
+        )
+
+    def traceparent(self, span: Span = None) -> str:
+        span = span or self.root
+        return f"00-{self.trace_id}-{span.span_id}-{'01' if self.sampled else '00'}"
+
+    def finish(self):
+        self.root.end()
+        _current_span.reset(self._token)
+
+
+def parse_traceparent(value: Optional[str]):
+    # W3C: versão-trace_id-parent_id-flags
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        if int(parts[1], 16) == 0 or int(parts[2], 16) == 0:
+            return None
+        sampled = bool(int(parts[3][:2], 16) & 1)
+    except ValueError:
+        return None
+    return parts[1].lower(), parts[2].lower(), sampled
+
+
+def start_request_trace(name: str, traceparent: str = None) -> RequestTrace:
+    return RequestTrace(name, traceparent)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, kind: int = KIND_INTERNAL, **attributes) -> Optional[Span]:
+    """Span encerrado manualmente com ``end()``; não vira o span corrente."""
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    return Span(parent.trace, name, parent.span_id, kind, attributes)
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes):
+    parent = _current_span.get()
+    if parent is None:
+        # Fora de uma requisição (ex.: workers de CLI) não há o que medir
+        yield None
+        return
+    child = Span(parent.trace, name, parent.span_id, kind, attributes)
+    token = _current_span.set(child)
+    error = False
+    try:
+        yield child
+    except BaseException:
+        error = True
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end(error)
+
+
+def current_durations() -> dict:
+    current = _current_span.get()
+    return current.trace.phase_durations() if current else None
+
+
+def inject_headers(headers: dict = None) -> dict:
+    """Propaga o contexto do trace em chamadas HTTP de saída."""
+    headers = dict(headers or {})
+    current = _current_span.get()
+    if current is not None:
+        headers["traceparent"] = current.trace.traceparent(current)
+    return headers
+
+
+def to_otlp(spans: list) -> dict:
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        {"key": "service.name", "value": {"stringValue": settings.APP_NAME}}
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": "app.infrastructure.telemetry.tracing"},
+                        "spans": [_span_to_otlp(s) for s in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def _span_to_otlp(span: Span) -> dict:
+    data = {
+        "traceId": span.trace.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [_attribute(k, v) for k, v in span.attributes.items()],
+        "status": {"code": STATUS_ERROR if span.error else STATUS_OK},
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class BatchSpanExporter:
+    """
+    Acumula spans e exporta em lotes (OTLP/JSON) numa thread própria, para
+    um arquivo JSON Lines e/ou um coletor OTLP/HTTP (``/v1/traces``).
+    """
+
+    def __init__(
+        self,
+        file_path: str = None,
+        endpoint: str = None,
+        batch_size: int = None,
+        interval: float = None,
+        max_queue: int = None,
+    ):
+        self.file_path = settings.TRACING_EXPORT_FILE if file_path is None else file_path
+        self.endpoint = settings.TRACING_OTLP_ENDPOINT if endpoint is None else endpoint
+        self.batch_size = batch_size or settings.TRACING_EXPORT_BATCH_SIZE
+        self.interval = interval or settings.TRACING_EXPORT_INTERVAL_SECONDS
+        self._queue = deque(maxlen=max_queue or settings.TRACING_EXPORT_QUEUE_SIZE)
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.exported = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.file_path or self.endpoint)
+
+    def add(self, span: Span):
+        # deque com maxlen descarta os spans mais antigos se o exportador atrasar
+        self._queue.append(span)
+        if self._thread is None:
+            self._start()
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self):
+        while True:
+            # O lock só cobre a retirada do lote: o POST não bloqueia outro flush
+            with self._lock:
+                batch = []
+                while self._queue and len(batch) < self.batch_size:
+                    batch.append(self._queue.popleft())
+            if not batch:
+                return
+            self._export(batch)
+
+    def shutdown(self):
+        self.flush()
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="span-exporter", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Erro ao exportar spans")
+
+    def _export(self, batch: list):
+        payload = json.dumps(to_otlp(batch), separators=(",", ":"))
+        try:
+            if self.file_path:
+                with self._lock, open(self.file_path, "a") as f:
+                    f.write(payload + "\n")
+            if self.endpoint:
+                import httpx
+
+                httpx.post(
+                    self.endpoint,
+                    content=payload,
+                    headers={"Content-Type": "application/json"},
+                    timeout=5.0,
+                ).raise_for_status()
+        except Exception as e:
+            with self._lock:
+                self.failed += len(batch)
+            logger.error(f"Falha ao exportar {len(batch)} spans: {str(e)}")
+            return
+        with self._lock:
+            self.exported += len(batch)
+
+
+exporter = BatchSpanExporter()
@@ -0,0 +1,204 @@
+import logging
+import threading
+import time
+
+from app.core.config import settings
+from app.infrastructure.telemetry.periodic import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "usage"
+FIELDS = ("requests", "errors", "bytes_in", "bytes_out", "wall_us", "cpu_us")
+
+
+class UsageAccountant:
+    """
+    Contabiliza o uso por tenant (requisições, erros, bytes e tempo de CPU
+    estimado) em memória e grava a cada ``flush_interval`` com um único
+    pipeline de ``HINCRBY`` em hashes por janela de tempo
+    (``usage:{tenant}:{início da janela}``).
+
+    O tempo de CPU do processo no intervalo é rateado entre os tenants pela
+    proporção do tempo de parede das requisições de cada um.
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        bucket_seconds: int = None,
+        flush_interval: float = None,
+        retention_days: int = None,
+    ):
+        self.redis = redis_client
+        self.bucket_seconds = bucket_seconds or settings.USAGE_BUCKET_SECONDS
+        self.flush_interval = flush_interval or settings.USAGE_FLUSH_INTERVAL_SECONDS
+        self.retention_seconds = (retention_days or settings.USAGE_RETENTION_DAYS) * 86400
+        self._pending = {}
+        # Contadores de um flush que falhou: a CPU já foi rateada entre eles
+        self._retry = {}
+        # Tenants gravados cujo SADD no set da janela falhou
+        self._unlisted = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher = PeriodicTask(self.flush, self.flush_interval, "usage-flusher")
+        self._cpu_mark = time.process_time()
+        self.flushes = 0
+        self.failed_flushes = 0
+
+    def record(
+        self,
+        tenant: str,
+        duration: float,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+        error: bool = False,
+        timestamp: float = None,
+    ):
+        bucket = self.bucket_start(time.time() if timestamp is None else timestamp)
+        key = (tenant or "anonymous", bucket)
+        with self._lock:
+            counters = self._pending.get(key)
+            if counters is None:
+                counters = self._pending[key] = dict.fromkeys(FIELDS, 0)
+            counters["requests"] += 1
+            counters["errors"] += int(error)
+            counters["bytes_in"] += bytes_in
+            counters["bytes_out"] += bytes_out
+            counters["wall_us"] += int(duration * 1e6)
+        self._flusher.ensure_started()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                retry, self._retry = self._retry, {}
+                unlisted, self._unlisted = self._unlisted, {}
+                cpu_now = time.process_time()
+                cpu_us = int((cpu_now - self._cpu_mark) * 1e6)
+                self._cpu_mark = cpu_now
+            if not pending and not retry and not unlisted:
+                return 0
+
+            # Só o tempo de parede novo entra no rateio da CPU do intervalo
+            self._apportion_cpu(pending, cpu_us)
+            for group, counters in retry.items():
+                current = pending.setdefault(group, dict.fromkeys(FIELDS, 0))
+                for field, value in counters.items():
+                    current[field] += value
+            increments = {}
+            members = {key: set(tenants) for key, tenants in unlisted.items()}
+            for (tenant, bucket), counters in pending.items():
+                increments[self.key(tenant, bucket)] = {
+                    field: value for field, value in counters.items() if value
+                }
+                members.setdefault(self.tenants_key(bucket), set()).add(tenant)
+            try:
+                failed = self.redis.hincrby_many(
+                    increments,
+                    expire=self.retention_seconds,
+                    members={key: sorted(tenants) for key, tenants in members.items()},
+                )
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error(f"Falha ao gravar uso por tenant: {str(e)}")
+                self._restore(pending, unlisted)
+                return 0
+
+            self.flushes += 1
+            if not failed:
+                return len(pending)
+            # Só os campos recusados voltam: os demais já foram somados
+            self.failed_flushes += 1
+            logger.error(f"Falha ao gravar uso por tenant em {len(failed)} chaves")
+            retry = {}
+            for group, counters in pending.items():
+                fields = failed.get(self.key(*group))
+                if fields:
+                    retry[group] = {field: counters[field] for field in fields}
+            self._restore(
+                retry, {key: failed[key] for key in failed if key in members}
+            )
+            return len(pending) - len(retry)
+
+    def shutdown(self):
+        self._flusher.stop()
+        self.flush()
+
+    def totals(self, start: float, end: float, tenant: str = None) -> dict:
+        """
+        Soma os contadores gravados por tenant entre ``start`` e ``end``
+        (epoch), limitados à retenção. ``ValueError`` se a janela pedida for
+        maior que a retenção.
+        """
+        now = time.time()
+        end = min(end, now)
+        if end - start > self.retention_seconds:
+            raise ValueError(
+                f"Janela maior que a retenção de {self.retention_seconds // 86400} dias"
+            )
+        start = max(start, now - self.retention_seconds)
+        buckets = list(
+            range(self.bucket_start(start), int(end) + 1, self.bucket_seconds)
+        )
+        if tenant:
+            groups = [(tenant, bucket) for bucket in buckets]
+        else:
+            tenant_sets = self.redis.smembers_many(
+                [self.tenants_key(bucket) for bucket in buckets]
+            )
+            groups = [
+                (name, bucket)
+                for bucket, tenants in zip(buckets, tenant_sets)
+                for name in sorted(tenants)
+            ]
+
+        keys = [self.key(name, bucket) for name, bucket in groups]
+        totals = {}
+        for (name, _), values in zip(groups, self.redis.hgetall_many(keys) if keys else []):
+            if not values:
+                continue
+            summary = totals.setdefault(name, dict.fromkeys(FIELDS, 0))
+            for field, value in values.items():
+                if field in summary:
+                    summary[field] += int(value)
+        return {
+            name: {
+                "requests": counters["requests"],
+                "errors": counters["errors"],
+                "bytes_in": counters["bytes_in"],
+                "bytes_out": counters["bytes_out"],
+                "wall_seconds": counters["wall_us"] / 1e6,
+                "cpu_seconds": counters["cpu_us"] / 1e6,
+            }
+            for name, counters in totals.items()
+        }
+
+    def bucket_start(self, timestamp: float) -> int:
+        return int(timestamp // self.bucket_seconds) * self.bucket_seconds
+
+    @staticmethod
+    def key(tenant: str, bucket: int) -> str:
+        return f"{KEY_PREFIX}:{tenant}:{bucket}"
+
+    @staticmethod
+    def tenants_key(bucket: int) -> str:
+        # Prefixo próprio: não colide com um tenant chamado "tenants"
+        return f"{KEY_PREFIX}-tenants:{bucket}"
+
+    @staticmethod
+    def _apportion_cpu(pending: dict, cpu_us: int):
+        wall_total = sum(counters["wall_us"] for counters in pending.values())
+        if not wall_total:
+            return
+        for counters in pending.values():
+            counters["cpu_us"] += cpu_us * counters["wall_us"] // wall_total
+
+    def _restore(self, pending: dict, unlisted: dict):
+        # Devolve os contadores para a próxima tentativa, fora do rateio da CPU
+        with self._lock:
+            for key, counters in pending.items():
+                current = self._retry.setdefault(key, {})
+                for field, value in counters.items():
+                    current[field] = current.get(field, 0) + value
+            for key, tenants in unlisted.items():
+                self._unlisted.setdefault(key, set()).update(tenants)
@@ -1,7 +1,12 @@
 import time
 import threading
-import psutil
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.core.startup import startup_profiler
+from app.infrastructure.resilience.circuit_breaker import breakers_snapshot
+from app.interface.api.actuator.security import require_actuator_token
 
 startup_time = time.time()
 
@@ -21,10 +26,12 @@ def health():
 @router.get(
     "/metrics",
 )
-def metrics():
+def metrics(request: Request):
     """
     Retorna métricas da aplicação.
     """
+    import psutil
+
     return {
         "application": {
             "uptime_seconds": time.time() - startup_time,
@@ -46,4 +53,208 @@ def metrics():
             },
         },
         "threads": {"active_count": threading.active_count()},
+        "telemetry": request.app.container.telemetry_scheduler().metrics(),
+        "event_loop": request.app.container.loop_monitor().metrics(),
+    }
+
+
+@router.get(
+    "/startup",
+)
+def startup():
+    """
+    Retorna o tempo gasto em cada fase de inicialização do processo.
+    """
+    return startup_profiler.report()
+
+
+@router.get(
+    "/circuit-breakers",
+)
+def circuit_breakers():
+    """
+    Retorna o estado dos circuit breakers das dependências externas.
+    """
+    return {"circuit_breakers": breakers_snapshot()}
+
+
+@router.get(
+    "/concurrency",
+    dependencies=[Depends(require_actuator_token)],
+)
+def concurrency(request: Request):
+    """
+    Retorna o limite de concorrência atual, as filas por tenant e as rejeições.
+    """
+    return request.app.container.concurrency_limiter().snapshot()
+
+
+@router.get(
+    "/usage",
+    dependencies=[Depends(require_actuator_token)],
+)
+def usage(
+    request: Request,
+    tenant: Optional[str] = None,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+):
+    """
+    Retorna o uso por tenant (requisições, erros, bytes e CPU estimada) entre
+    ``start`` e ``end`` (epoch em segundos; padrão: últimas 24 horas).
+    """
+    end = time.time() if end is None else end
+    start = end - 86400 if start is None else start
+    accountant = request.app.container.usage_accountant()
+    try:
+        tenants = accountant.totals(start, end, tenant)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "start": start,
+        "end": end,
+        "bucket_seconds": accountant.bucket_seconds,
+        "tenants": tenants,
     }
+
+
+@router.get(
+    "/loop-lag",
+    dependencies=[Depends(require_actuator_token)],
+)
+def loop_lag(request: Request, limit: int = Query(20, ge=1)):
+    """
+    Retorna o atraso do event loop e os pontos de chamada que o bloquearam,
+    ordenados pelo tempo total de bloqueio.
+    """
+    return request.app.container.loop_monitor().report(limit)
+
+
+def memory_profiler(request: Request):
+    return request.app.container.memory_profiler()
+
+
+def memory_report(fn, *args, **kwargs):
+    from app.infrastructure.telemetry.memory import SnapshotNotFound
+
+    try:
+        return fn(*args, **kwargs)
+    except SnapshotNotFound as e:
+        raise HTTPException(status_code=404, detail=f"Snapshot {e.args[0]} não encontrado")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get(
+    "/memory",
+    dependencies=[Depends(require_actuator_token)],
+)
+def memory_status(request: Request):
+    """
+    Retorna o estado do tracemalloc, da amostragem e os snapshots guardados.
+    """
+    return memory_profiler(request).status()
+
+
+@router.post(
+    "/memory/start",
+    dependencies=[Depends(require_actuator_token)],
+)
+def memory_start(
+    request: Request,
+    # Limite do próprio tracemalloc para frames por traceback
+    frames: Optional[int] = Query(None, ge=1, le=65535),
+):
+    """
+    Liga o tracemalloc guardando ``frames`` níveis de traceback por alocação.
+    """
+    return memory_profiler(request).start(frames)
+
+
+@router.post(
+    "/memory/stop",
+    dependencies=[Depends(require_actuator_token)],
+)
+def memory_stop(request: Request):
+    """
+    Desliga o tracemalloc (e a amostragem) liberando o custo do rastreamento.
+    """
+    return memory_profiler(request).stop()
+
+
+@router.post(
+    "/memory/sampling/start",
+    dependencies=[Depends(require_actuator_token)],
+)
+def memory_sampling_start(request: Request):
+    """
+    Liga a amostragem periódica; só um worker por máquina consegue ligar.
+    """
+    return {"sampling": memory_profiler(request).start_sampling()}
+
+
+@router.post(
+    "/memory/sampling/stop",
+    dependencies=[Depends(require_actuator_token)],
+)
+def memory_sampling_stop(request: Request):
+    """
+    Desliga a amostragem periódica.
+    """
+    memory_profiler(request).stop_sampling()
+    return {"sampling": False}
+
+
+@router.post(
+    "/memory/snapshots",
+    dependencies=[Depends(require_actuator_token)],
+)
+def memory_take_snapshot(request: Request):
+    """
+    Tira um snapshot das alocações rastreadas.
+    """
+    return memory_report(memory_profiler(request).take_snapshot)
+
+
+@router.get(
+    "/memory/snapshots/{snapshot_id}",
+    dependencies=[Depends(require_actuator_token)],
+)
+def memory_top(
+    request: Request,
+    snapshot_id: int,
+    group_by: str = "lineno",
+    limit: int = Query(20, ge=1),
+):
+    """
+    Retorna os maiores pontos de alocação do snapshot, agrupados por
+    ``lineno``, ``filename`` ou ``traceback``.
+    """
+    return memory_report(
+        memory_profiler(request).top, snapshot_id, group_by=group_by, limit=limit
+    )
+
+
+@router.get(
+    "/memory/snapshots/{first_id}/diff/{second_id}",
+    dependencies=[Depends(require_actuator_token)],
+)
+def memory_diff(
+    request: Request,
+    first_id: int,
+    second_id: int,
+    group_by: str = "lineno",
+    limit: int = Query(20, ge=1),
+):
+    """
+    Retorna o que cresceu (ou diminuiu) entre dois snapshots.
+    """
+    return memory_report(
+        memory_profiler(request).diff,
+        first_id,
+        second_id,
+        group_by=group_by,
+        limit=limit,
+    )
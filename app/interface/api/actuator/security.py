@@ -0,0 +1,16 @@
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.config import settings
+
+
+def require_actuator_token(x_actuator_token: Optional[str] = Header(None)):
+    """Protege os endpoints administrativos do actuator com ACTUATOR_TOKEN."""
+    if not settings.ACTUATOR_TOKEN:
+        raise HTTPException(status_code=404)
+    if not x_actuator_token or not secrets.compare_digest(
+        x_actuator_token, settings.ACTUATOR_TOKEN
+    ):
+        raise HTTPException(status_code=403)
@@ -0,0 +1,42 @@
+import logging
+import signal
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def add_arguments(parser):
+    parser.add_argument("--consumer", default=None, help="padrão: host-pid")
+    parser.add_argument("--group", default=None)
+    parser.add_argument("--stream", default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--block-ms", type=int, default=None)
+    parser.add_argument("--claim-idle-ms", type=int, default=None)
+
+
+def main(args) -> int:
+    from app.core.container import Container
+    from app.infrastructure.adapters.redis_stream_adapter import RedisStreamLogConsumer
+
+    logging.basicConfig(level=settings.LOGGING_LEVEL)
+    consumer = RedisStreamLogConsumer(
+        settings.REDIS_URL,
+        Container().open_search_port(),
+        stream=args.stream,
+        group=args.group,
+        consumer=args.consumer,
+        batch_size=args.batch_size,
+        block_ms=args.block_ms,
+        claim_idle_ms=args.claim_idle_ms,
+    )
+
+    def stop(signum, frame):
+        # Termina o lote atual; o que não recebeu ack é retomado por outro consumidor
+        logger.info("Encerrando consumidor de logs")
+        consumer.stop()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    consumer.run()
+    return 0
@@ -0,0 +1,26 @@
+import argparse
+import sys
+
+from app.interface.cli import log_consumer, serve
+
+COMMANDS = {
+    "serve": serve,
+    "log-consumer": log_consumer,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app")
+    subparsers = parser.add_subparsers(dest="command")
+    serve.add_arguments(
+        subparsers.add_parser("serve", help="inicia o servidor HTTP de produção")
+    )
+    log_consumer.add_arguments(
+        subparsers.add_parser(
+            "log-consumer", help="grava no OpenSearch os logs publicados no Redis Stream"
+        )
+    )
+
+    argv = sys.argv[1:] if argv is None else argv
+    args = parser.parse_args(argv or ["serve"])
+    return COMMANDS[args.command].main(args)
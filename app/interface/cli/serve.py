@@ -0,0 +1,303 @@
+import importlib.util
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+@dataclass
+class ServerConfig:
+    app: str = "app.main:app"
+    host: str = "0.0.0.0"
+    port: int = 5000
+    workers: int = 1
+    loop: str = "asyncio"
+    http: str = "h11"
+    backlog: int = 2048
+    reuse_port: bool = True
+    preload: bool = True
+    max_requests: int = 0
+    max_requests_jitter: int = 0
+    max_rss_mb: int = 0
+    graceful_timeout: int = 30
+    keep_alive: int = 5
+    log_level: str = "info"
+    access_log: bool = False
+    min_worker_uptime: float = 5.0
+    respawn_backoff: float = 0.5
+    max_respawn_backoff: float = 30.0
+    crash_loop_limit: int = 5
+
+
+def available_cpus(cgroup_cpu_max: str = CGROUP_CPU_MAX) -> int:
+    """
+    CPUs realmente disponíveis: afinidade do processo limitada pela quota
+    do cgroup (containers costumam ver todos os CPUs do host).
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    try:
+        with open(cgroup_cpu_max) as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def build_config(**overrides) -> ServerConfig:
+    """Combina Settings e argumentos da linha de comando (``None`` = padrão)."""
+    config = ServerConfig(
+        host=settings.SERVER_HOST,
+        port=settings.SERVER_PORT,
+        workers=settings.SERVER_WORKERS or available_cpus(),
+        loop="uvloop" if _installed("uvloop") else "asyncio",
+        http="httptools" if _installed("httptools") else "h11",
+        backlog=settings.SERVER_BACKLOG,
+        max_requests=settings.SERVER_MAX_REQUESTS,
+        max_requests_jitter=settings.SERVER_MAX_REQUESTS_JITTER,
+        max_rss_mb=settings.SERVER_MAX_RSS_MB,
+        graceful_timeout=settings.SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        keep_alive=settings.SERVER_KEEP_ALIVE_SECONDS,
+        log_level=settings.LOGGING_LEVEL.lower(),
+        min_worker_uptime=settings.SERVER_MIN_WORKER_UPTIME_SECONDS,
+        respawn_backoff=settings.SERVER_RESPAWN_BACKOFF_SECONDS,
+        max_respawn_backoff=settings.SERVER_RESPAWN_MAX_BACKOFF_SECONDS,
+        crash_loop_limit=settings.SERVER_CRASH_LOOP_LIMIT,
+    )
+    for key, value in overrides.items():
+        if value is not None:
+            setattr(config, key, value)
+    if not hasattr(socket, "SO_REUSEPORT"):
+        config.reuse_port = False
+    return config
+
+
+def describe(config: ServerConfig) -> str:
+    lines = [f"{settings.APP_NAME} - configuração do servidor:"]
+    lines += [f"  {key:<20} {value}" for key, value in asdict(config).items()]
+    lines.append(f"  {'pid':<20} {os.getpid()}")
+    return "\n".join(lines)
+
+
+def bind_socket(config: ServerConfig) -> socket.socket:
+    family = socket.AF_INET6 if ":" in config.host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if config.reuse_port:
+        # Cada worker tem o próprio socket e o kernel distribui as conexões
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((config.host, config.port))
+    sock.listen(config.backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def load_app(path: str):
+    module_name, _, attr = path.partition(":")
+    return getattr(importlib.import_module(module_name), attr or "app")
+
+
+def run_worker(config: ServerConfig, app=None, sock: socket.socket = None):
+    import uvicorn
+
+    max_requests = None
+    if config.max_requests:
+        max_requests = config.max_requests + random.randint(0, config.max_requests_jitter)
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app or config.app,
+            loop=config.loop,
+            http=config.http,
+            backlog=config.backlog,
+            limit_max_requests=max_requests,
+            timeout_graceful_shutdown=config.graceful_timeout,
+            timeout_keep_alive=config.keep_alive,
+            log_level=config.log_level,
+            access_log=config.access_log,
+            lifespan="on",
+        )
+    )
+    if config.max_rss_mb:
+        threading.Thread(
+            target=_watch_rss, args=(server, config.max_rss_mb), daemon=True
+        ).start()
+    server.run(sockets=[sock or bind_socket(config)])
+
+
+def _watch_rss(server, max_rss_mb: int, interval: float = 5.0):
+    import psutil
+
+    process = psutil.Process()
+    while not server.should_exit:
+        rss_mb = process.memory_info().rss / 1024 / 1024
+        if rss_mb > max_rss_mb:
+            logger.warning(
+                f"Worker {os.getpid()} com {rss_mb:.0f} MB de RSS (limite {max_rss_mb} MB), reciclando"
+            )
+            server.should_exit = True
+            return
+        time.sleep(interval)
+
+
+class Supervisor:
+    """
+    Processo mestre: carrega a aplicação uma vez (preload) e faz fork dos
+    workers, recriando os que saem (reciclagem por requisições ou memória).
+    No SIGTERM/SIGINT repassa o sinal e aguarda o drain até o timeout.
+
+    Workers que morrem com erro logo após subir (import quebrado, porta em
+    uso...) são recriados com backoff exponencial; depois de
+    ``crash_loop_limit`` falhas seguidas o mestre encerra com código 1.
+    """
+
+    def __init__(self, config: ServerConfig, app=None):
+        self.config = config
+        self.app = app
+        self.workers = {}
+        self.stopping = False
+        self.exit_code = 0
+        self.fast_failures = 0
+        self._respawn_at = 0.0
+        # Sem SO_REUSEPORT os workers herdam um único socket do mestre
+        self.shared_socket = None if config.reuse_port else bind_socket(config)
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.config.workers):
+            self._spawn()
+        while not self.stopping:
+            self._reap()
+            if not self.stopping and time.monotonic() >= self._respawn_at:
+                for _ in range(self.config.workers - len(self.workers)):
+                    self._spawn()
+            time.sleep(0.2)
+        self._drain()
+        return self.exit_code
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.config, self.app, self.shared_socket)
+            except BaseException:
+                logger.exception(f"Worker {os.getpid()} finalizado com erro")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+        logger.info(f"Worker {pid} iniciado")
+
+    def _reap(self):
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.workers.clear()
+                return
+            if pid == 0:
+                return
+            started_at = self.workers.pop(pid, None)
+            code = os.waitstatus_to_exitcode(status)
+            logger.info(f"Worker {pid} saiu com status {code}")
+            if started_at is not None and not self.stopping:
+                self._record_exit(code, time.monotonic() - started_at)
+
+    def _record_exit(self, code: int, uptime: float):
+        if code == 0 or uptime >= self.config.min_worker_uptime:
+            # Reciclagem normal ou worker que chegou a atender: zera o backoff
+            self.fast_failures = 0
+            self._respawn_at = 0.0
+            return
+        self.fast_failures += 1
+        if self.fast_failures >= self.config.crash_loop_limit:
+            logger.error(
+                f"{self.fast_failures} workers falharam logo após subir, encerrando o servidor"
+            )
+            self.stopping = True
+            self.exit_code = 1
+            return
+        delay = min(
+            self.config.max_respawn_backoff,
+            self.config.respawn_backoff * 2 ** (self.fast_failures - 1),
+        )
+        self._respawn_at = time.monotonic() + delay
+        logger.warning(f"Worker falhou após {uptime:.1f}s, recriando em {delay:.1f}s")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _drain(self):
+        logger.info(f"Encerrando {len(self.workers)} workers")
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+        deadline = time.monotonic() + self.config.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self.workers):
+            logger.warning(f"Worker {pid} não terminou no prazo, enviando SIGKILL")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                self.workers.pop(pid, None)
+        self._reap()
+
+
+def serve(config: ServerConfig) -> int:
+    print(describe(config), flush=True)
+    app = load_app(config.app) if config.preload else None
+    if config.workers <= 1 or not hasattr(os, "fork"):
+        run_worker(config, app)
+        return 0
+    return Supervisor(config, app).run()
+
+
+def add_arguments(parser):
+    parser.add_argument("--app", default=None, help="módulo:atributo da aplicação ASGI")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="padrão: CPUs disponíveis")
+    parser.add_argument("--loop", choices=["uvloop", "asyncio"], default=None)
+    parser.add_argument("--http", choices=["httptools", "h11"], default=None)
+    parser.add_argument("--max-requests", type=int, default=None)
+    parser.add_argument("--max-requests-jitter", type=int, default=None)
+    parser.add_argument("--max-rss-mb", type=int, default=None)
+    parser.add_argument("--graceful-timeout", type=int, default=None)
+    parser.add_argument(
+        "--no-preload", dest="preload", action="store_false", default=None
+    )
+    parser.add_argument(
+        "--no-reuse-port", dest="reuse_port", action="store_false", default=None
+    )
+    parser.add_argument("--access-log", action="store_true", default=None)
+
+
+def main(args) -> int:
+    options = {key: value for key, value in vars(args).items() if key != "command"}
+    return serve(build_config(**options))
@@ -1,17 +1,23 @@
 import logging
 import re
+import time
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Request
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
 from starlette.responses import JSONResponse
 
+from app import IMPORTS_STARTED
 from app.core.config import settings
 from app.core.container import Container
+from app.core.startup import compile_route_policies, startup_profiler
+from app.infrastructure.telemetry import tracing
 from app.interface.api.actuator.endpoints import router as actuator_router
 from app.middlewares.unified_middleware import UnifiedMiddleware
 
+startup_profiler.record("imports", time.perf_counter() - IMPORTS_STARTED)
+
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
@@ -21,15 +27,16 @@ def create_app(environment: str = "development"):
         title=settings.APP_NAME,
         version="0.1.0",
         dependencies=[],
+        lifespan=lifespan if environment != "testing" else testing_lifespan,
     )
-    app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-    setup_exception_handlers(app)
-    setup_dependency_injection(app)
-    setup_middlewares(app)
-    setup_routers(app)
-    if environment != "testing":
-        app.add_event_handler("startup", startup)
-        app.add_event_handler("shutdown", shutdown)
+    with startup_profiler.phase("create_app.exception_handlers"):
+        setup_exception_handlers(app)
+    with startup_profiler.phase("create_app.dependency_injection"):
+        setup_dependency_injection(app)
+    with startup_profiler.phase("create_app.middlewares"):
+        setup_middlewares(app)
+    with startup_profiler.phase("create_app.routers"):
+        setup_routers(app)
 
     return app
 
@@ -74,12 +81,46 @@ def setup_middlewares(app: FastAPI):
     )
 
 
-def startup():
-    logger.info("Application startup")
+async def prewarm_adapters(container: Container):
+    for name in settings.prewarm_adapter_list:
+        with startup_profiler.phase(f"prewarm.{name}"):
+            adapter = getattr(container, name)()
+            if name == "auth_port" and settings.AUTH_ENABLED:
+                await adapter.refresh_keys()
+
 
+@asynccontextmanager
+async def testing_lifespan(app: FastAPI):
+    # Sem pré-aquecimento nem monitores: só o que o middleware precisa
+    compile_route_policies(app)
+    yield
 
-def shutdown():
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Application startup")
+    compile_route_policies(app)
+    await prewarm_adapters(app.container)
+    if settings.MEMORY_SAMPLING_ENABLED:
+        app.container.memory_profiler().start_sampling()
+    if settings.LOOP_MONITOR_ENABLED:
+        app.container.loop_monitor().start()
+    yield
     logger.info("Application shutdown")
+    if settings.LOOP_MONITOR_ENABLED:
+        await app.container.loop_monitor().stop()
+    if settings.MEMORY_SAMPLING_ENABLED:
+        await run_in_threadpool(app.container.memory_profiler().stop_sampling)
+    # Drena a fila de telemetria sem bloquear o event loop
+    if settings.USAGE_ENABLED:
+        await run_in_threadpool(app.container.usage_accountant().shutdown)
+    if settings.ROLLUP_ENABLED:
+        await run_in_threadpool(app.container.rollup_aggregator().shutdown)
+    await run_in_threadpool(app.container.telemetry_scheduler().shutdown)
+    if settings.LOG_TRANSPORT == "redis_stream":
+        # Publica o que sobrou no buffer depois de drenar a fila de telemetria
+        await run_in_threadpool(app.container.log_stream_port().shutdown)
+    await run_in_threadpool(tracing.exporter.shutdown)
 
 
 app = create_app()
@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    require_tenant: bool = True
+    capture_body: bool = True
+    log: bool = True
+    alerts: bool = True
+    rate_limited: bool = True
+    concurrency_limited: bool = True
+    # None usa o limite global (GLOBAL_RATE_LIMIT)
+    rate_limit: Optional[str] = None
+
+    @property
+    def passthrough(self) -> bool:
+        return not (self.log or self.alerts or self.rate_limited)
+
+
+DEFAULT_POLICY = RoutePolicy()
+
+IGNORED = RoutePolicy(
+    require_tenant=False,
+    capture_body=False,
+    log=False,
+    alerts=False,
+    rate_limited=False,
+    concurrency_limited=False,
+)
+
+# Prefixos comparados por segmento: "/config" vale para "/config" e
+# "/config/...", mas não para "/api/x/config/y"
+ROUTE_POLICIES: Dict[str, RoutePolicy] = {
+    "/actuator/health": IGNORED,
+    "/actuator/circuit-breakers": IGNORED,
+    "/actuator/concurrency": IGNORED,
+    "/actuator/usage": IGNORED,
+    "/actuator/memory": IGNORED,
+    "/actuator/loop-lag": IGNORED,
+    "/docs": IGNORED,
+    "/redoc": IGNORED,
+    "/openapi.json": IGNORED,
+    "/config": IGNORED,
+    "/favicon": IGNORED,
+    "/favicon.ico": IGNORED,
+    "/admin": RoutePolicy(
+        capture_body=False, log=False, alerts=False, rate_limited=False
+    ),
+}
+
+
+def split_path(path: str) -> list:
+    return [segment for segment in path.split("/") if segment]
+
+
+class _Node:
+    __slots__ = ("static", "param", "catch_all", "policy")
+
+    def __init__(self):
+        self.static = {}
+        self.param = None
+        self.catch_all = None
+        self.policy = None
+
+
+class RoutePolicyTable:
+    """
+    Resolve a política de cada requisição com uma única busca. Os templates
+    das rotas da aplicação (ex.: ``/items/{item_id}``) são compilados numa
+    árvore por segmento e cada folha guarda a política já resolvida, de modo
+    que a tabela declarativa é consultada uma vez por template.
+    """
+
+    def __init__(
+        self,
+        policies: Dict[str, RoutePolicy] = None,
+        default: RoutePolicy = DEFAULT_POLICY,
+    ):
+        self.default = default
+        self._prefixes = _Node()
+        for prefix, policy in (ROUTE_POLICIES if policies is None else policies).items():
+            node = self._prefixes
+            for segment in split_path(prefix):
+                node = node.static.setdefault(segment, _Node())
+            node.policy = policy
+        self._routes = _Node()
+        self.templates = {}
+
+    def compile(self, templates: Iterable[str]):
+        root = _Node()
+        resolved = {}
+        for template in templates:
+            node = root
+            for segment in split_path(template):
+                if segment.startswith("{") and segment.endswith("}"):
+                    if segment.endswith(":path}"):
+                        node.catch_all = node.catch_all or _Node()
+                        node = node.catch_all
+                        break
+                    node.param = node.param or _Node()
+                    node = node.param
+                else:
+                    node = node.static.setdefault(segment, _Node())
+            node.policy = self.match_prefix(template)
+            resolved[template] = node.policy
+        self._routes = root
+        self.templates = resolved
+        return self
+
+    def compile_app(self, app):
+        templates = []
+        for route in app.routes:
+            path = getattr(route, "path", None)
+            if path is None:
+                continue
+            # Mount (ex.: arquivos estáticos) atende tudo abaixo do prefixo
+            if not hasattr(route, "endpoint") and hasattr(route, "routes"):
+                path = path.rstrip("/") + "/{path:path}"
+            templates.append(path)
+        return self.compile(templates)
+
+    def resolve(self, path: str) -> RoutePolicy:
+        segments = split_path(path)
+        policy = self._match_route(self._routes, segments, 0)
+        if policy is not None:
+            return policy
+        # Caminho sem rota (404, favicon...): usa só a tabela de prefixos
+        return self.match_prefix(path)
+
+    def match_prefix(self, path: str) -> RoutePolicy:
+        node = self._prefixes
+        policy = node.policy or self.default
+        for segment in split_path(path):
+            if segment.startswith("{"):
+                break
+            node = node.static.get(segment)
+            if node is None:
+                break
+            if node.policy is not None:
+                policy = node.policy
+        return policy
+
+    def _match_route(self, node: _Node, segments: list, i: int):
+        if i == len(segments):
+            if node.policy is not None:
+                return node.policy
+            return node.catch_all.policy if node.catch_all else None
+        child = node.static.get(segments[i])
+        if child is not None:
+            policy = self._match_route(child, segments, i + 1)
+            if policy is not None:
+                return policy
+        if node.param is not None:
+            policy = self._match_route(node.param, segments, i + 1)
+            if policy is not None:
+                return policy
+        if node.catch_all is not None:
+            return node.catch_all.policy
+        return None
@@ -5,13 +5,11 @@ import time
 import traceback
 import uuid
 from datetime import datetime, timezone
+from functools import cached_property
 from http import HTTPStatus
 
 from app.core.container import Container
-from fastapi import Request, Response, HTTPException, BackgroundTasks
-from keycloak.exceptions import KeycloakAuthenticationError
-from slowapi import Limiter
-from slowapi.errors import RateLimitExceeded
+from fastapi import Request, Response, HTTPException
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import JSONResponse
 from dependency_injector.wiring import Provide, inject
@@ -19,31 +17,17 @@ from app.infrastructure.mappings.opensearch.log_entries import get_log_entries_m
 
 from app.core.config import settings
 from app.domain.entities.log_entry import LogEntry
-from app.infrastructure.adapters.email_adapter import EmailAdapter
-from app.infrastructure.cache.redis import RedisClient
+from app.domain.exceptions.auth import AuthenticationError
+from app.domain.exceptions.circuit_breaker import CircuitOpenError
+from app.domain.exceptions.overload import OverloadedError
+from app.domain.exceptions.rate_limit import RateLimitExceededError
+from app.infrastructure.telemetry import tracing
+from app.infrastructure.telemetry.scheduler import PRIORITY_ALERT, PRIORITY_LOG
 
 logger = logging.getLogger(__name__)
 
-IGNORED_ROUTES = [
-    "/actuator/health",
-    "/docs",
-    "/redoc",
-    "/openapi.json",
-    "/admin",
-    "/config",
-    "/favicon",
-]
-
-BYPASS_ROUTES = [
-    "/actuator/health",
-    "/docs",
-    "/redoc",
-    "/openapi.json",
-    "/config",
-    "/favicon"
-]
-
-redis = RedisClient(redis_url=settings.REDIS_URL)
+# Respostas de autenticação/autorização não geram email de alerta
+AUTH_REJECTIONS = (401, 403)
 
 
 def get_random_ip():
@@ -64,28 +48,114 @@ def rate_limit_key_func(request: Request) -> str:
     return f"{rnd}{client_ip}:{path}:{method}:{tenant_id}:{session_id}:{user_agent}:{geolocation}"
 
 
-def get_schema_name(tenant_id):
-    if tenant_id:
-        return redis.get(tenant_id)
-    return "no_tenant_defined"
-
-
 class UnifiedMiddleware(BaseHTTPMiddleware):
     @inject
     def __init__(self, app, container: Container = Provide[Container]):
         super().__init__(app)
-        self.open_search_port = container.open_search_port()
-        self.limiter = Limiter(
-            key_func=rate_limit_key_func, storage_uri=settings.REDIS_URL
-        )
+        self.container = container
         self.global_rate_limit = f"{settings.GLOBAL_RATE_LIMIT}/minute"
-        self.email_adapter = EmailAdapter()
+        self._limited_handlers = {}
+        self.auth_enabled = settings.AUTH_ENABLED
+        if self.auth_enabled and not settings.keycloak_jwks_url:
+            raise ValueError(
+                "AUTH_ENABLED exige KEYCLOAK_JWKS_URL ou KEYCLOAK_SERVER_URL e KEYCLOAK_REALM_NAME"
+            )
+        self.geolocation_enabled = bool(settings.GEOIP_DATABASE_PATH)
+
+    # Adapters são criados sob demanda, no primeiro uso
+    @cached_property
+    def open_search_port(self):
+        return self.container.open_search_port()
+
+    @cached_property
+    def email_adapter(self):
+        return self.container.email_port()
+
+    @cached_property
+    def auth_port(self):
+        return self.container.auth_port()
+
+    @cached_property
+    def route_policies(self):
+        return self.container.route_policies()
+
+    @cached_property
+    def geolocation(self):
+        return self.container.geolocation_port()
+
+    @cached_property
+    def redis(self):
+        return self.container.redis_client()
+
+    @cached_property
+    def telemetry(self):
+        return self.container.telemetry_scheduler()
+
+    @cached_property
+    def log_stream(self):
+        return self.container.log_stream_port()
+
+    @cached_property
+    def usage(self):
+        return self.container.usage_accountant()
+
+    @cached_property
+    def rollup(self):
+        return self.container.rollup_aggregator()
+
+    @cached_property
+    def concurrency(self):
+        return self.container.concurrency_limiter()
+
+    @cached_property
+    def limiter(self):
+        from slowapi import Limiter
+
+        # Com o Redis fora do ar o limite passa a ser contado em memória
+        return Limiter(
+            key_func=rate_limit_key_func,
+            storage_uri=settings.REDIS_URL,
+            storage_options={
+                "socket_timeout": settings.REDIS_TIMEOUT_SECONDS,
+                "socket_connect_timeout": settings.REDIS_TIMEOUT_SECONDS,
+            },
+            in_memory_fallback_enabled=True,
+        )
+
+    def get_schema_name(self, tenant_id):
+        if tenant_id:
+            return self.redis.get(tenant_id)
+        return "no_tenant_defined"
+
+    def get_alert_schema(self, request: Request):
+        if hasattr(request.state, "schema"):
+            return request.state.schema
+        tenant_id = request.headers.get("X-Tenant-ID")
+        try:
+            return self.get_schema_name(tenant_id)
+        except Exception:
+            return tenant_id
 
     async def dispatch(self, request: Request, call_next):
+        trace = tracing.start_request_trace(
+            f"{request.method} {request.url.path}", request.headers.get("traceparent")
+        )
+        try:
+            response = await self.process_request(request, call_next)
+            trace.root.set_attribute("http.status_code", response.status_code)
+        finally:
+            trace.finish()
+        if settings.TRACING_SERVER_TIMING:
+            response.headers["Server-Timing"] = trace.server_timing()
+        return response
+
+    async def process_request(self, request: Request, call_next):
         request_id = str(uuid.uuid4())
         request.state.request_id = request_id
         start_time = time.time()
-        background_tasks = BackgroundTasks()
+
+        # TODO: Trocar para Cloudflare repassar depois
+        client_ip = request.headers.get("client-ip")
 
         # Inicializa o log_entry
         log_entry = LogEntry(
@@ -93,24 +163,33 @@ class UnifiedMiddleware(BaseHTTPMiddleware):
             method=request.method,
             path=request.url.path,
             query_params=str(request.query_params),
-            ip_address=request.headers.get(
-                "client-ip", get_random_ip()
-            ),  # TODO: Trocar para Cloudflare repassar depois
+            ip_address=client_ip or get_random_ip(),
             user_agent=request.headers.get("User-Agent", "unknown"),
-            # O formato do geolocation no opensearch é [40.7128, -74.0060]
-            geolocation=request.headers.get("geolocation", None),
+            geolocation=self.get_geolocation(client_ip, request),
             session_id=request.headers.get("session-id", None),
             timestamp=datetime.now(timezone.utc),
             tenant_id=request.headers.get("X-Tenant-ID"),
         )
 
+        policy = self.resolve_policy(request)
+
         try:
             # Tratamento do Tenant
-            if not self.is_bypass_route(request.url.path):
+            if policy.require_tenant:
                 header_tenant = request.headers.get("X-Tenant-ID")
+                with tracing.span("auth"):
+                    token_tenant = await self.authenticate(request)
+                if token_tenant:
+                    if header_tenant and header_tenant != token_tenant:
+                        raise AuthenticationError(
+                            "Tenant não autorizado", status_code=403
+                        )
+                    header_tenant = token_tenant
+                    log_entry.tenant_id = token_tenant
                 if not header_tenant:
                     return self.build_response(400, "Requisição inválida", request_id)
-                schema_name = get_schema_name(header_tenant)
+                with tracing.span("tenant"):
+                    schema_name = self.get_schema_name(header_tenant)
                 if not schema_name:
                     return self.build_response(400, "Requisição inválida", request_id)
                 request.state.schema = schema_name
@@ -118,29 +197,28 @@ class UnifiedMiddleware(BaseHTTPMiddleware):
                     f"Tenant schema definido para: {schema_name} no request_id: {request_id}"
                 )
 
-            if any(request.url.path.startswith(route) for route in IGNORED_ROUTES):
+            if policy.passthrough:
                 return await call_next(request)
 
-            # Processa o corpo da requisição
-            (
-                log_entry.request_body,
-                log_entry.request_headers,
-            ) = await self.process_request_body(request)
-
-            # Rate Limiting
-            response = await self.limiter.limit(self.global_rate_limit)(call_next)(
-                request
-            )
-
-            log_entry.response_body = await self.process_response_body(response)
+            log_entry.request_headers = dict(request.headers)
+            if policy.concurrency_limited and settings.CONCURRENCY_LIMIT_ENABLED:
+                # O slot cobre handler e leitura da resposta: é a latência do limite
+                async with self.concurrency.slot(log_entry.tenant_id or "anonymous"):
+                    response = await self.process_limited(
+                        request, call_next, log_entry, policy
+                    )
+            else:
+                response = await self.process_limited(
+                    request, call_next, log_entry, policy
+                )
             process_time = time.time() - start_time
             log_entry.response_status_code = response.status_code
             log_entry.response_headers = dict(response.headers)
             log_entry.duration = process_time
             logger.info(f"[Request Concluído]: {log_entry}")
 
-            if process_time > settings.SLOW_API_THRESHOLD:
-                background_tasks.add_task(
+            if policy.alerts and process_time > settings.SLOW_API_THRESHOLD:
+                self.telemetry.submit(
                     self.send_error_email,
                     request.headers.get("X-Tenant-ID"),
                     f"Tempo de resposta alto na rota {request.url.path}",
@@ -151,57 +229,74 @@ class UnifiedMiddleware(BaseHTTPMiddleware):
                     <p><strong>IP:</strong> {log_entry.ip_address}</p>
                     <p><strong>Session ID:</strong> {log_entry.session_id}</p>
                     """,
+                    priority=PRIORITY_ALERT,
                 )
 
-            # Agendamento de tarefas em background
-            background_tasks.add_task(self.save_log, log_entry)
-
-            if response.status_code >= 400 and response.status_code not in [401]:
-                background_tasks.add_task(
-                    self.send_error_email,
-                    request.state.schema
-                    if hasattr(request.state, "schema")
-                    else get_schema_name(request.headers.get("X-Tenant-ID")),
-                    f"Erro na API para request_id {request_id}",
-                    f"""
-                    <p><strong>Erro:</strong> {log_entry.response_body}</p>
-                    <p><strong>Rota:</strong> {log_entry.path}</p>
-                    <p><strong>Método:</strong> {log_entry.method}</p>
-                    <p><strong>Request ID:</strong> {request_id}</p>
-                    <p><strong>IP:</strong> {log_entry.ip_address}</p>
-                    <p><strong>Session ID:</strong> {log_entry.session_id}</p>
-                    """,
+            # Agendamento das tarefas de telemetria
+            if policy.log:
+                self.record_request(
+                    log_entry,
+                    request,
+                    int(response.headers.get("content-length") or 0),
                 )
+
+            if response.status_code >= 400 and response.status_code not in AUTH_REJECTIONS:
+                if policy.alerts:
+                    self.telemetry.submit(
+                        self.send_error_email,
+                        self.get_alert_schema(request),
+                        f"Erro na API para request_id {request_id}",
+                        f"""
+                        <p><strong>Erro:</strong> {log_entry.response_body}</p>
+                        <p><strong>Rota:</strong> {log_entry.path}</p>
+                        <p><strong>Método:</strong> {log_entry.method}</p>
+                        <p><strong>Request ID:</strong> {request_id}</p>
+                        <p><strong>IP:</strong> {log_entry.ip_address}</p>
+                        <p><strong>Session ID:</strong> {log_entry.session_id}</p>
+                        """,
+                        priority=PRIORITY_ALERT,
+                    )
                 response = self.build_response(
                     response.status_code,
                     self.get_http_error_detail(response.status_code),
                     request_id,
                 )
-            response.background = background_tasks  # Anexa as tarefas em background
             return response
 
         except Exception as exc:
             return await self.handle_exception(
-                exc, request, log_entry, start_time, background_tasks
+                exc, request, log_entry, start_time, policy
             )
 
-    async def handle_exception(
-        self, exc, request, log_entry, start_time, background_tasks
-    ):
+    async def handle_exception(self, exc, request, log_entry, start_time, policy):
         process_time = time.time() - start_time
         log_entry.duration = process_time
 
-        if isinstance(exc, RateLimitExceeded):
+        headers = None
+        if isinstance(exc, RateLimitExceededError):
             status_code = 429
             detail = "Muitas requisições"
             logger.warning(
                 f"Limite de requisições excedido no request_id {log_entry.request_id}"
             )
-        elif isinstance(exc, KeycloakAuthenticationError):
-            status_code = exc.response_code
+        elif isinstance(exc, AuthenticationError):
+            status_code = exc.status_code
             detail = "Erro de autenticação"
-            logger.exception(
-                f"Erro de autenticação no request_id {log_entry.request_id}"
+            logger.warning(
+                f"Token rejeitado no request_id {log_entry.request_id}: {exc.detail}"
+            )
+        elif isinstance(exc, CircuitOpenError):
+            status_code = 503
+            detail = HTTPStatus.SERVICE_UNAVAILABLE.phrase
+            logger.warning(
+                f"Dependência '{exc.name}' indisponível no request_id {log_entry.request_id}"
+            )
+        elif isinstance(exc, OverloadedError):
+            status_code = exc.status_code
+            detail = self.get_http_error_detail(status_code)
+            headers = {"Retry-After": str(exc.retry_after)}
+            logger.warning(
+                f"Requisição rejeitada ({exc.reason}) no request_id {log_entry.request_id}"
             )
         elif isinstance(exc, HTTPException):
             status_code = exc.status_code
@@ -217,31 +312,138 @@ class UnifiedMiddleware(BaseHTTPMiddleware):
 
         # Envia email de erro detalhado
         traceback_str = traceback.format_exc()
-        background_tasks.add_task(
-            self.send_error_email,
-            request.state.schema
-            if hasattr(request.state, "schema")
-            else get_schema_name(request.headers.get("X-Tenant-ID")),
-            f"Erro no request_id {log_entry.request_id}",
-            f"""
-            <p><strong>Erro:</strong> {str(exc)}</p>
-            <p><strong>Request ID:</strong> {log_entry.request_id}</p>
-            <p><strong>Rota:</strong> {log_entry.path}</p>
-            <p><strong>Método:</strong> {log_entry.method}</p>
-            <p><strong>IP:</strong> {log_entry.ip_address}</p>
-            <p><strong>Session ID:</strong> {log_entry.session_id}</p>
-            <p><strong>Traceback:</strong></p>
-            <pre>{traceback_str}</pre>
-            """,
-        )
+        # Circuito aberto, sobrecarga e tokens rejeitados já são estados
+        # conhecidos: evita um email por requisição
+        if (
+            policy.alerts
+            and status_code not in AUTH_REJECTIONS
+            and not isinstance(
+                exc, (AuthenticationError, CircuitOpenError, OverloadedError)
+            )
+        ):
+            self.telemetry.submit(
+                self.send_error_email,
+                self.get_alert_schema(request),
+                f"Erro no request_id {log_entry.request_id}",
+                f"""
+                <p><strong>Erro:</strong> {str(exc)}</p>
+                <p><strong>Request ID:</strong> {log_entry.request_id}</p>
+                <p><strong>Rota:</strong> {log_entry.path}</p>
+                <p><strong>Método:</strong> {log_entry.method}</p>
+                <p><strong>IP:</strong> {log_entry.ip_address}</p>
+                <p><strong>Session ID:</strong> {log_entry.session_id}</p>
+                <p><strong>Traceback:</strong></p>
+                <pre>{traceback_str}</pre>
+                """,
+                priority=PRIORITY_ALERT,
+            )
 
-        background_tasks.add_task(self.save_log, log_entry)
-        response = self.build_response(
-            status_code, detail, log_entry.request_id, traceback_str=traceback_str
+        if policy.log:
+            self.record_request(log_entry, request)
+        return self.build_response(
+            status_code,
+            detail,
+            log_entry.request_id,
+            traceback_str=traceback_str,
+            headers=headers,
         )
-        response.background = background_tasks
+
+    async def process_limited(
+        self, request: Request, call_next, log_entry: LogEntry, policy
+    ):
+        # Processa o corpo da requisição
+        if policy.capture_body:
+            with tracing.span("body_capture"):
+                log_entry.request_body = await self.process_request_body(request)
+
+        # Rate Limiting
+        if policy.rate_limited:
+            rate_limit_span = tracing.start_span("rate_limit")
+            try:
+                response = await self.get_limited_handler(
+                    policy.rate_limit or self.global_rate_limit
+                )(request, call_next, rate_limit_span)
+            finally:
+                rate_limit_span.end()
+        else:
+            response = await self.call_handler(request, call_next)
+
+        if policy.capture_body:
+            with tracing.span("response_buffer"):
+                log_entry.response_body = await self.process_response_body(response)
         return response
 
+    @staticmethod
+    async def call_handler(request: Request, call_next, rate_limit_span=None):
+        if rate_limit_span is not None:
+            # A verificação do limite termina quando o handler começa
+            rate_limit_span.end()
+        with tracing.span("handler"):
+            return await call_next(request)
+
+    def get_limited_handler(self, limit: str):
+        # O slowapi registra o limite a cada decoração: decora uma vez por limite
+        handler = self._limited_handlers.get(limit)
+        if handler is None:
+            from slowapi.errors import RateLimitExceeded
+
+            # O slowapi localiza o parâmetro "request"; os demais são repassados
+            async def limited_handler(request: Request, call_next, rate_limit_span):
+                return await self.call_handler(request, call_next, rate_limit_span)
+
+            limited_handler.__name__ = f"limited_handler_{len(self._limited_handlers)}"
+            decorated = self.limiter.limit(limit)(limited_handler)
+
+            async def handler(request: Request, call_next, rate_limit_span):
+                try:
+                    return await decorated(request, call_next, rate_limit_span)
+                except RateLimitExceeded as e:
+                    raise RateLimitExceededError(limit) from e
+
+            self._limited_handlers[limit] = handler
+        return handler
+
+    def record_request(self, log_entry: LogEntry, request: Request, bytes_out: int = 0):
+        bytes_in = int(request.headers.get("content-length") or 0)
+        if settings.USAGE_ENABLED:
+            self.usage.record(
+                log_entry.tenant_id,
+                log_entry.duration,
+                bytes_in=bytes_in,
+                bytes_out=bytes_out,
+                error=log_entry.response_status_code >= 400,
+            )
+        if settings.ROLLUP_ENABLED:
+            route = request.scope.get("route")
+            self.rollup.record(
+                log_entry.tenant_id,
+                log_entry.method,
+                getattr(route, "path", None),
+                log_entry.response_status_code,
+                log_entry.duration,
+                bytes_in=bytes_in,
+                bytes_out=bytes_out,
+            )
+        log_entry.spans = tracing.current_durations()
+        self.telemetry.submit(self.save_log, log_entry, priority=PRIORITY_LOG)
+
+    async def authenticate(self, request: Request):
+        if not self.auth_enabled:
+            return None
+        authorization = request.headers.get("Authorization", "")
+        if not authorization.lower().startswith("bearer "):
+            # Com autenticação ativa o X-Tenant-ID sozinho não basta
+            raise AuthenticationError("Token de acesso ausente")
+        claims = await self.auth_port.verify_token(authorization[7:].strip())
+        request.state.token_claims = claims
+        request.state.user_id = claims.get("sub")
+        request.state.username = claims.get("preferred_username")
+        request.state.tenant_id = claims.get(settings.KEYCLOAK_TENANT_CLAIM)
+        if not request.state.tenant_id:
+            # Sem a claim o X-Tenant-ID não verificado escolheria o schema
+            raise AuthenticationError("Token sem tenant", status_code=403)
+        return request.state.tenant_id
+
     @staticmethod
     def get_http_error_detail(status_code):
         error_messages = {
@@ -254,23 +456,23 @@ class UnifiedMiddleware(BaseHTTPMiddleware):
             422: HTTPStatus.UNPROCESSABLE_ENTITY.phrase,
             429: HTTPStatus.TOO_MANY_REQUESTS.phrase,
             500: HTTPStatus.INTERNAL_SERVER_ERROR.phrase,
+            503: HTTPStatus.SERVICE_UNAVAILABLE.phrase,
         }
         return error_messages.get(status_code, "Erro desconhecido")
 
-    @staticmethod
-    def is_bypass_route(path: str) -> bool:
-        return any(route in path for route in BYPASS_ROUTES)
+    def resolve_policy(self, request: Request):
+        # A tabela é compilada no startup (compile_route_policies)
+        return self.route_policies.resolve(request.url.path)
 
     @staticmethod
     async def process_request_body(request: Request):
-        request_headers = dict(request.headers)
         try:
             request_body = await request.json()
         except (json.JSONDecodeError, UnicodeDecodeError):
             request_body = await request.body()
             request_body = request_body.decode("utf-8", errors="ignore")
             request_body = {"raw_body": request_body}
-        return request_body, request_headers
+        return request_body
 
     @staticmethod
     async def process_response_body(response: Response) -> str:
@@ -287,6 +489,10 @@ class UnifiedMiddleware(BaseHTTPMiddleware):
 
     def save_log(self, log_entry: LogEntry):
         try:
+            if settings.LOG_TRANSPORT == "redis_stream":
+                # A indexação fica a cargo do worker "log-consumer"
+                self.log_stream.publish(log_entry.to_dict())
+                return
             mapping = get_log_entries_mapping()
             self.open_search_port.set("logs", log_entry.to_dict(), mapping)
         except Exception as e:
@@ -318,7 +524,11 @@ class UnifiedMiddleware(BaseHTTPMiddleware):
 
     @staticmethod
     def build_response(
-        status_code: int, detail: str, request_id: str, traceback_str: str = None
+        status_code: int,
+        detail: str,
+        request_id: str,
+        traceback_str: str = None,
+        headers: dict = None,
     ) -> JSONResponse:
         response_content = {
             "status_code": status_code,
@@ -331,8 +541,12 @@ class UnifiedMiddleware(BaseHTTPMiddleware):
         return JSONResponse(
             status_code=status_code,
             content=response_content,
+            headers=headers,
         )
 
-    @staticmethod
-    def get_geolocation(ip_address):
-        pass  # TODO: Implementar função de geolocalização
+    def get_geolocation(self, ip_address, request: Request):
+        if not self.geolocation_enabled:
+            # O formato do geolocation no opensearch é [40.7128, -74.0060]
+            return request.headers.get("geolocation", None)
+        # Com a base local configurada o header do cliente não é usado
+        return self.geolocation.lookup(ip_address)
@@ -0,0 +1,105 @@
+import pytest
+from dependency_injector import providers
+
+from app.domain.ports.opensearch_port import BulkResult
+from app.infrastructure.resilience import circuit_breaker
+from app.infrastructure.telemetry import tracing
+from app.main import create_app
+
+
+class FakeRedis:
+    """
+    RedisClient em memória: cada tenant tem o schema ``schema_{tenant}``.
+    ``down`` falha os pipelines inteiros; as chaves em ``fail_keys`` e os
+    pares ``(chave, campo)`` em ``fail_fields`` são recusados
+    individualmente, como um erro do Redis num comando.
+    """
+
+    def __init__(self):
+        self.hashes = {}
+        self.sets = {}
+        self.pipelines = 0
+        self.down = False
+        self.fail_keys = set()
+        self.fail_fields = set()
+
+    def get(self, key):
+        with tracing.span("redis.get", tracing.KIND_CLIENT):
+            return f"schema_{key}"
+
+    def hincrby_many(self, increments, expire=None, members=None):
+        if self.down:
+            raise ConnectionError("redis fora do ar")
+        self.pipelines += 1
+        failed = {}
+        for key, fields in increments.items():
+            current = self.hashes.setdefault(key, {})
+            for field, amount in fields.items():
+                if key in self.fail_keys or (key, field) in self.fail_fields:
+                    failed.setdefault(key, set()).add(field)
+                    continue
+                current[field] = str(int(current.get(field, 0)) + amount)
+        for key, values in (members or {}).items():
+            if key in self.fail_keys:
+                failed.setdefault(key, set()).update(values)
+                continue
+            self.sets.setdefault(key, set()).update(values)
+        return failed
+
+    def hgetall_many(self, keys):
+        return [dict(self.hashes.get(key, {})) for key in keys]
+
+    def smembers_many(self, keys):
+        return [set(self.sets.get(key, set())) for key in keys]
+
+
+class FakeOpenSearch:
+    """
+    OpenSearchPort em memória. ``reject`` mapeia posição no lote -> status
+    HTTP dos documentos recusados; ``unavailable`` falha o lote inteiro.
+    """
+
+    def __init__(self):
+        self.documents = []
+        self.batches = []
+        self.timestamp_fields = []
+        self.reject = {}
+        self.unavailable = False
+
+    def set(self, index, data, mapping=None, nivel="INFO"):
+        self.documents.append(data)
+
+    def bulk(self, index, documents, mapping=None, timestamp_field=None):
+        if self.unavailable:
+            return BulkResult(len(documents), unavailable=True)
+        self.timestamp_fields.append(timestamp_field)
+        rejected = {p: status for p, status in self.reject.items() if p < len(documents)}
+        self.batches.append(
+            (index, [d for p, d in enumerate(documents) if p not in rejected])
+        )
+        return BulkResult(len(documents), rejected)
+
+
+@pytest.fixture(autouse=True)
+def isolated_breakers(monkeypatch):
+    # Cada teste registra seus próprios circuitos "redis", "smtp"...
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
+
+
+@pytest.fixture
+def fake_opensearch():
+    return FakeOpenSearch()
+
+
+@pytest.fixture
+def fake_app(fake_redis, fake_opensearch):
+    """Aplicação de teste com Redis e OpenSearch em memória."""
+    app = create_app("testing")
+    app.container.redis_client.override(providers.Object(fake_redis))
+    app.container.open_search_port.override(providers.Object(fake_opensearch))
+    return app
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+
+from app.domain.exceptions.circuit_breaker import CircuitOpenError
+from app.infrastructure.cache.redis import RedisClient
+from app.infrastructure.resilience.circuit_breaker import CircuitBreaker, get_breaker
+
+
+def fail():
+    raise ConnectionError("down")
+
+
+def make_breaker(**kwargs):
+    options = dict(window_size=4, min_calls=2, failure_rate_threshold=0.5, open_seconds=0.05)
+    options.update(kwargs)
+    return CircuitBreaker("test", **options)
+
+
+def test_opens_after_failures_and_closes_after_probe():
+    breaker = make_breaker()
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+
+    assert breaker.snapshot()["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "ok")
+
+    time.sleep(0.06)
+    assert breaker.snapshot()["state"] == "half_open"
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.snapshot()["state"] == "closed"
+    assert breaker.rejected == 1
+
+
+def test_slow_calls_open_circuit():
+    breaker = make_breaker(slow_call_seconds=0.001, slow_call_rate_threshold=1.0)
+    breaker.call(time.sleep, 0.01)
+    breaker.call(time.sleep, 0.01)
+    assert breaker.snapshot()["state"] == "open"
+
+
+def test_results_from_a_previous_state_are_ignored():
+    breaker = make_breaker()
+    generation = breaker._acquire()
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(fail)
+    time.sleep(0.06)
+    probe = breaker._acquire()
+    assert breaker.state == "half_open"
+
+    # Chamada admitida com o circuito fechado termina durante o half-open
+    breaker._record(generation, failed=False, elapsed=0.0)
+    assert breaker.state == "half_open"
+    breaker._record(generation, failed=True, elapsed=0.0)
+    assert breaker.state == "half_open"
+    assert breaker.times_opened == 1
+
+    breaker._record(probe, failed=False, elapsed=0.0)
+    assert breaker.state == "closed"
+
+
+def test_get_breaker_rejects_conflicting_configuration():
+    breaker = get_breaker("shared", slow_call_seconds=0.5)
+    assert get_breaker("shared") is breaker
+    assert get_breaker("shared", slow_call_seconds=0.5) is breaker
+    with pytest.raises(ValueError):
+        get_breaker("shared", slow_call_seconds=0.05)
+
+
+class FlakyRedis:
+    def __init__(self):
+        self.data = {"acme": "acme_schema"}
+        self.down = False
+
+    def get(self, key):
+        if self.down:
+            raise ConnectionError("down")
+        return self.data.get(key)
+
+
+def test_redis_serves_last_known_value_while_unavailable():
+    client = RedisClient("redis://localhost:6379", timeout=0.1)
+    client._redis = FlakyRedis()
+    client.breaker = make_breaker(open_seconds=60)
+
+    assert client.get("acme") == "acme_schema"
+    client._redis.down = True
+    assert client.get("acme") == "acme_schema"
+    assert client.get("acme") == "acme_schema"
+    assert client.breaker.snapshot()["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        client.get("other")
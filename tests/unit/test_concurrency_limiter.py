@@ -0,0 +1,160 @@
+import asyncio
+
+import time
+
+import pytest
+from dependency_injector import providers
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+
+from app.domain.exceptions.overload import OverloadedError
+from app.infrastructure.resilience.concurrency_limiter import (
+    REASON_QUEUE_FULL,
+    REASON_QUEUE_TIMEOUT,
+    REASON_TENANT_QUEUE_FULL,
+    AdaptiveConcurrencyLimiter,
+)
+
+
+def make_limiter(**kwargs):
+    options = dict(
+        initial_limit=1,
+        min_limit=1,
+        max_limit=50,
+        max_queue=10,
+        tenant_max_queue=5,
+        max_queue_seconds=1.0,
+    )
+    options.update(kwargs)
+    return AdaptiveConcurrencyLimiter(**options)
+
+
+def test_queued_tenants_are_served_round_robin():
+    limiter = make_limiter()
+    order = []
+
+    async def request(tenant, name):
+        async with limiter.slot(tenant):
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await limiter.acquire("noisy")
+        tasks = [asyncio.create_task(request("noisy", f"noisy-{i}")) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(request("quiet", "quiet-0")))
+        await asyncio.sleep(0)
+        limiter.release("noisy")
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+    assert order == ["noisy-0", "quiet-0", "noisy-1", "noisy-2"]
+    snapshot = limiter.snapshot()
+    assert snapshot["inflight"] == 0
+    assert snapshot["queued"] == 0
+
+
+def test_rejects_when_queues_are_full_or_wait_expires():
+    limiter = make_limiter(max_queue=2, tenant_max_queue=1, max_queue_seconds=0.05)
+
+    async def run():
+        await limiter.acquire("a")
+        waiting = asyncio.create_task(limiter.acquire("a"))
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError) as tenant_full:
+            await limiter.acquire("a")
+        other = asyncio.create_task(limiter.acquire("b"))
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError) as queue_full:
+            await limiter.acquire("c")
+        with pytest.raises(OverloadedError) as timeout:
+            await waiting
+        with pytest.raises(OverloadedError):
+            await other
+        return tenant_full.value, queue_full.value, timeout.value
+
+    tenant_full, queue_full, timeout = asyncio.run(run())
+    assert (tenant_full.status_code, tenant_full.reason) == (429, REASON_TENANT_QUEUE_FULL)
+    assert (queue_full.status_code, queue_full.reason) == (503, REASON_QUEUE_FULL)
+    assert (timeout.status_code, timeout.reason) == (503, REASON_QUEUE_TIMEOUT)
+    assert timeout.retry_after >= 1
+    snapshot = limiter.snapshot()
+    assert snapshot["queued"] == 0
+    assert snapshot["tenants"]["a"]["rejected"] == 2
+
+
+def test_limit_follows_latency():
+    limiter = make_limiter(initial_limit=20, min_limit=2)
+    for _ in range(200):
+        # Sob carga e com latência estável o limite cresce
+        limiter.inflight = int(limiter.limit)
+        limiter._update_limit(0.01, limiter.inflight)
+    grown = limiter.limit
+    assert grown > 20
+
+    for _ in range(50):
+        limiter._update_limit(0.2, limiter.inflight)
+    assert limiter.limit < grown / 2
+
+    idle = make_limiter(initial_limit=20)
+    for _ in range(100):
+        idle._update_limit(0.01, 1)
+    assert idle.limit == 20
+
+
+def test_idle_tenants_are_evicted():
+    limiter = make_limiter(tenant_idle_seconds=0.01)
+
+    async def run(tenant):
+        async with limiter.slot(tenant):
+            pass
+
+    asyncio.run(run("a"))
+    time.sleep(0.02)
+    asyncio.run(run("b"))
+    assert set(limiter.snapshot()["tenants"]) == {"b"}
+
+
+def test_middleware_sheds_with_retry_after(monkeypatch, fake_app):
+    monkeypatch.setattr(settings, "ACTUATOR_TOKEN", "segredo")
+    monkeypatch.setattr(settings, "CONCURRENCY_LIMIT_ENABLED", True)
+    app = fake_app
+    limiter = make_limiter(tenant_max_queue=0)
+    app.container.concurrency_limiter.override(providers.Object(limiter))
+
+    @app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    client = TestClient(app)
+    headers = {"X-Tenant-ID": "acme"}
+    asyncio.run(limiter.acquire("acme"))
+    response = client.get("/api/ping", headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    limiter.release("acme")
+    assert client.get("/api/ping", headers=headers).status_code == 200
+
+    # Lista tenants: só com o token do actuator
+    assert client.get("/actuator/concurrency").status_code == 403
+    snapshot = client.get(
+        "/actuator/concurrency", headers={"X-Actuator-Token": "segredo"}
+    ).json()
+    assert snapshot["rejected"][REASON_TENANT_QUEUE_FULL] == 1
+    assert snapshot["tenants"]["acme"] == {"inflight": 0, "queued": 0, "rejected": 1}
+
+
+def test_middleware_does_not_shed_by_default(fake_app):
+    limiter = make_limiter(tenant_max_queue=0)
+    fake_app.container.concurrency_limiter.override(providers.Object(limiter))
+
+    @fake_app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    asyncio.run(limiter.acquire("acme"))
+    response = TestClient(fake_app).get("/api/ping", headers={"X-Tenant-ID": "acme"})
+    assert response.status_code == 200
+    assert limiter.accepted == 1
@@ -0,0 +1,52 @@
+import os
+
+from app.infrastructure.adapters.geolocation_adapter import (
+    GeolocationAdapter,
+    compile_database,
+)
+
+
+def write_database(tmp_path, rows, name="geo.bin"):
+    source = tmp_path / "geo.csv"
+    source.write_text("start,end,latitude,longitude\n" + "\n".join(rows) + "\n")
+    destination = tmp_path / name
+    compile_database(str(source), str(destination))
+    return destination
+
+
+def test_lookup_ipv4_and_ipv6(tmp_path):
+    path = write_database(
+        tmp_path,
+        [
+            "1.0.0.0,1.0.0.255,-23.5505,-46.6333",
+            "8.8.8.0/24,37.386,-122.0838",
+            "2001:db8::,2001:db8::ffff,40.7128,-74.006",
+        ],
+    )
+    adapter = GeolocationAdapter(path=str(path), cache_size=16)
+
+    assert adapter.lookup("1.0.0.42") == {"lat": -23.5505, "lon": -46.6333}
+    assert adapter.lookup("8.8.8.8") == {"lat": 37.386, "lon": -122.0838}
+    assert adapter.lookup("::ffff:8.8.8.8") == {"lat": 37.386, "lon": -122.0838}
+    assert adapter.lookup("2001:db8::1") == {"lat": 40.7128, "lon": -74.006}
+    assert adapter.lookup("1.0.1.0") is None
+    assert adapter.lookup("2001:db9::1") is None
+    assert adapter.lookup("not-an-ip") is None
+
+
+def test_reloads_when_file_changes(tmp_path):
+    path = write_database(tmp_path, ["10.0.0.0/8,1.0,2.0"])
+    adapter = GeolocationAdapter(path=str(path), reload_check_seconds=0)
+    assert adapter.lookup("10.1.2.3") == {"lat": 1.0, "lon": 2.0}
+
+    write_database(tmp_path, ["10.0.0.0/8,3.0,4.0", "11.0.0.0/8,5.0,6.0"])
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert adapter.lookup("10.1.2.3") == {"lat": 3.0, "lon": 4.0}
+    assert adapter.lookup("11.0.0.1") == {"lat": 5.0, "lon": 6.0}
+
+
+def test_missing_database_returns_none(tmp_path):
+    adapter = GeolocationAdapter(path=str(tmp_path / "missing.bin"))
+    assert adapter.lookup("8.8.8.8") is None
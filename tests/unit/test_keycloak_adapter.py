@@ -0,0 +1,199 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from dependency_injector import providers
+from fastapi import Request
+from fastapi.testclient import TestClient
+from jwcrypto import jwk, jwt
+
+from app.core.config import settings
+from app.domain.exceptions.auth import AuthenticationError
+from app.infrastructure.adapters.keycloak_adapter import KeycloakJwksAdapter
+
+ISSUER = "http://keycloak.local/realms/test"
+
+
+class FakeJwksServer:
+    def __init__(self):
+        self.keys = jwk.JWKSet()
+        self.hits = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.hits += 1
+                body = server.keys.export(private_keys=False).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/certs"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def add_key(self, kid):
+        key = jwk.JWK.generate(kty="RSA", size=2048, kid=kid, alg="RS256")
+        self.keys.add(key)
+        return key
+
+
+@pytest.fixture
+def jwks_server():
+    server = FakeJwksServer()
+    yield server
+    server.httpd.shutdown()
+
+
+def make_token(key, exp_offset=60, **claims):
+    token = jwt.JWT(
+        header={"alg": "RS256", "kid": key.get("kid")},
+        claims={"iss": ISSUER, "exp": int(time.time()) + exp_offset, **claims},
+    )
+    token.make_signed_token(key)
+    return token.serialize()
+
+
+def make_adapter(server, **kwargs):
+    return KeycloakJwksAdapter(
+        jwks_url=server.url, issuer=ISSUER, audience="", **kwargs
+    )
+
+
+def test_verify_token_memoizes_claims(jwks_server):
+    key = jwks_server.add_key("k1")
+    adapter = make_adapter(jwks_server)
+    token = make_token(key, sub="user-1", tenant_id="acme")
+
+    async def run():
+        first = await adapter.verify_token(token)
+        second = await adapter.verify_token(token)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["sub"] == "user-1"
+    assert first["tenant_id"] == "acme"
+    assert second is first
+    assert jwks_server.hits == 1
+
+
+def test_unknown_kid_refreshes_jwks(jwks_server):
+    old_key = jwks_server.add_key("k1")
+    adapter = make_adapter(jwks_server, min_refresh_seconds=0)
+
+    async def run():
+        await adapter.verify_token(make_token(old_key, sub="a"))
+        new_key = jwks_server.add_key("k2")
+        return await adapter.verify_token(make_token(new_key, sub="b"))
+
+    assert asyncio.run(run())["sub"] == "b"
+    assert jwks_server.hits == 2
+
+
+def test_rejects_expired_and_foreign_tokens(jwks_server):
+    key = jwks_server.add_key("k1")
+    foreign = jwk.JWK.generate(kty="RSA", size=2048, kid="k1", alg="RS256")
+    adapter = make_adapter(jwks_server)
+
+    with pytest.raises(AuthenticationError):
+        asyncio.run(adapter.verify_token(make_token(key, exp_offset=-3600)))
+    with pytest.raises(AuthenticationError):
+        asyncio.run(adapter.verify_token(make_token(foreign)))
+    with pytest.raises(AuthenticationError):
+        asyncio.run(adapter.verify_token("not-a-token"))
+
+
+def test_unavailable_jwks_is_retried_only_after_min_interval():
+    adapter = KeycloakJwksAdapter(
+        jwks_url="http://127.0.0.1:9/certs", issuer=ISSUER, min_refresh_seconds=60
+    )
+    token = make_token(jwk.JWK.generate(kty="RSA", size=2048, kid="k1", alg="RS256"))
+    attempts = []
+    fetch = adapter._fetch_keys
+
+    async def counting_fetch():
+        attempts.append(time.time())
+        await fetch()
+
+    adapter._fetch_keys = counting_fetch
+
+    async def run():
+        for _ in range(3):
+            with pytest.raises(AuthenticationError) as exc:
+                await adapter.verify_token(token)
+            assert exc.value.status_code == 503
+
+    asyncio.run(run())
+    assert len(attempts) == 1
+
+
+class RecordingScheduler:
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, fn, *args, **kwargs):
+        self.tasks.append(fn.__name__)
+        return True
+
+
+@pytest.fixture
+def auth_app(monkeypatch, jwks_server, fake_app):
+    monkeypatch.setattr(settings, "AUTH_ENABLED", True)
+    monkeypatch.setattr(settings, "KEYCLOAK_JWKS_URL", jwks_server.url)
+    monkeypatch.setattr(settings, "USAGE_ENABLED", False)
+    monkeypatch.setattr(settings, "ROLLUP_ENABLED", False)
+    app = fake_app
+    app.scheduler = RecordingScheduler()
+    app.container.telemetry_scheduler.override(providers.Object(app.scheduler))
+    app.container.auth_port.override(providers.Object(make_adapter(jwks_server)))
+
+    @app.get("/api/whoami")
+    def whoami(request: Request):
+        return {"user_id": request.state.user_id, "tenant_id": request.state.tenant_id}
+
+    return app
+
+
+def test_middleware_requires_bearer_token_when_auth_enabled(auth_app):
+    client = TestClient(auth_app)
+    response = client.get("/api/whoami", headers={"X-Tenant-ID": "acme"})
+    assert response.status_code == 401
+    # Token rejeitado não é erro da aplicação: só o log é agendado
+    assert auth_app.scheduler.tasks == ["save_log"]
+
+
+def test_middleware_takes_tenant_from_token(auth_app, jwks_server):
+    key = jwks_server.add_key("k1")
+    client = TestClient(auth_app)
+    bearer = {"Authorization": f"Bearer {make_token(key, sub='u1', tenant_id='acme')}"}
+
+    response = client.get("/api/whoami", headers=bearer)
+    assert response.status_code == 200
+    assert response.json() == {"user_id": "u1", "tenant_id": "acme"}
+    assert client.get("/api/whoami", headers={**bearer, "X-Tenant-ID": "acme"}).status_code == 200
+    assert client.get("/api/whoami", headers={**bearer, "X-Tenant-ID": "globex"}).status_code == 403
+
+
+def test_middleware_rejects_token_without_tenant_claim(auth_app, jwks_server):
+    key = jwks_server.add_key("k1")
+    bearer = {"Authorization": f"Bearer {make_token(key, sub='u1')}"}
+    response = TestClient(auth_app).get("/api/whoami", headers={**bearer, "X-Tenant-ID": "acme"})
+    assert response.status_code == 403
+
+
+def test_keycloak_settings_alone_do_not_enable_auth(monkeypatch, fake_app):
+    monkeypatch.setattr(settings, "KEYCLOAK_SERVER_URL", "http://keycloak.local")
+    monkeypatch.setattr(settings, "KEYCLOAK_REALM_NAME", "test")
+
+    @fake_app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    assert TestClient(fake_app).get("/api/ping", headers={"X-Tenant-ID": "acme"}).status_code == 200
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.infrastructure.telemetry.loop_monitor import LoopLagMonitor
+from app.main import create_app
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+def test_blocking_call_is_reported_by_call_site():
+    monitor = LoopLagMonitor(interval=0.02, threshold=0.05)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.1)
+        blocking_call()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    asyncio.run(run())
+    report = monitor.report()
+    assert report["beats"] > 0
+    assert report["stalls"] >= 1
+    assert report["lag_ms"]["max"] >= 200
+
+    hotspot = report["hotspots"][0]
+    assert hotspot["site"].startswith(f"{__file__}:")
+    assert hotspot["site"].endswith("blocking_call")
+    assert hotspot["samples"] >= 2
+    assert hotspot["stalls"] == 1
+    assert hotspot["total_lag_ms"] >= 200
+    assert any("run" in frame for frame in hotspot["stack"])
+
+
+def test_idle_loop_has_no_hotspots():
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.1)
+
+    async def run():
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    asyncio.run(run())
+    report = monitor.report()
+    assert report["beats"] >= 3
+    assert report["hotspots"] == []
+    assert report["lag_ms"]["p50"] < 100
+
+
+def test_loop_lag_endpoint(monkeypatch):
+    monkeypatch.setattr(settings, "ACTUATOR_TOKEN", "segredo")
+    client = TestClient(create_app("testing"))
+    assert client.get("/actuator/loop-lag").status_code == 403
+    response = client.get("/actuator/loop-lag", headers={"X-Actuator-Token": "segredo"})
+    assert response.status_code == 200
+    assert {"beats", "stalls", "lag_ms", "hotspots"} <= set(response.json())
+    response = client.get(
+        "/actuator/loop-lag?limit=-1", headers={"X-Actuator-Token": "segredo"}
+    )
+    assert response.status_code == 422
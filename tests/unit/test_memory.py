@@ -0,0 +1,92 @@
+import time
+import tracemalloc
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.infrastructure.telemetry.memory import MemoryProfiler, SnapshotNotFound
+from app.main import create_app
+
+retained = []
+
+
+def leak(n: int):
+    retained.extend(bytearray(1024) for _ in range(n))
+
+
+@pytest.fixture(autouse=True)
+def stop_tracemalloc():
+    yield
+    retained.clear()
+    tracemalloc.stop()
+
+
+def test_diff_points_at_allocating_line(tmp_path):
+    profiler = MemoryProfiler(lock_file=str(tmp_path / "lock"))
+    profiler.start()
+    first = profiler.take_snapshot()
+    leak(500)
+    second = profiler.take_snapshot()
+
+    diff = profiler.diff(first["id"], second["id"])
+    growth = diff["stats"][0]
+    assert growth["file"] == __file__
+    assert growth["size_diff_kb"] >= 500
+    assert profiler.top(second["id"], group_by="filename")["stats"]
+
+    with pytest.raises(SnapshotNotFound):
+        profiler.top(999)
+    with pytest.raises(ValueError):
+        profiler.top(second["id"], group_by="modulo")
+    assert profiler.stop()["tracing"] is False
+
+
+def test_sampling_takes_periodic_snapshots_in_one_worker(tmp_path):
+    lock_file = str(tmp_path / "lock")
+    profiler = MemoryProfiler(sample_seconds=0.1, interval_seconds=0.15, lock_file=lock_file)
+    canary = MemoryProfiler(lock_file=lock_file)
+    assert profiler.start_sampling()
+    assert not canary.start_sampling()
+
+    deadline = time.monotonic() + 5
+    while not profiler.list_snapshots() and time.monotonic() < deadline:
+        leak(10)
+        time.sleep(0.02)
+    profiler.stop_sampling()
+
+    snapshots = profiler.list_snapshots()
+    assert snapshots and snapshots[0]["source"] == "sampling"
+    assert not tracemalloc.is_tracing()
+    # Com o lock liberado outro worker pode assumir
+    assert canary.start_sampling()
+    canary.stop_sampling()
+
+
+def test_memory_endpoints(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "ACTUATOR_TOKEN", "segredo")
+    monkeypatch.setattr(settings, "MEMORY_SAMPLING_LOCK_FILE", str(tmp_path / "lock"))
+    client = TestClient(create_app("testing"))
+    headers = {"X-Actuator-Token": "segredo"}
+
+    assert client.post("/actuator/memory/start").status_code == 403
+    assert client.post("/actuator/memory/snapshots", headers=headers).status_code == 409
+    assert client.post("/actuator/memory/start", headers=headers).json()["tracing"]
+    first = client.post("/actuator/memory/snapshots", headers=headers).json()
+    leak(200)
+    second = client.post("/actuator/memory/snapshots", headers=headers).json()
+
+    top = client.get(f"/actuator/memory/snapshots/{second['id']}", headers=headers)
+    assert top.status_code == 200 and top.json()["stats"]
+    diff = client.get(
+        f"/actuator/memory/snapshots/{first['id']}/diff/{second['id']}", headers=headers
+    ).json()
+    assert diff["size_diff_kb"] > 0
+    assert client.get("/actuator/memory/snapshots/999", headers=headers).status_code == 404
+    for url in (
+        f"/actuator/memory/snapshots/{second['id']}?limit=-1",
+        f"/actuator/memory/snapshots/{first['id']}/diff/{second['id']}?limit=0",
+    ):
+        assert client.get(url, headers=headers).status_code == 422
+    assert client.post("/actuator/memory/stop", headers=headers).json()["tracing"] is False
+    assert client.post("/actuator/memory/start?frames=-1", headers=headers).status_code == 422
@@ -0,0 +1,235 @@
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+import redis
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.infrastructure.adapters.redis_stream_adapter import (
+    LOG_INDEX,
+    RedisStreamLogConsumer,
+    RedisStreamLogPublisher,
+)
+
+REDIS_URL = os.getenv("TEST_REDIS_URL", "redis://localhost:6379/15")
+
+
+class FakeStreamRedis:
+    """Só os comandos que o consumidor usa depois do bulk."""
+
+    def __init__(self, deliveries=1):
+        self.deliveries = deliveries
+        self.delivered = {}
+        self.acked = []
+        self.dead = []
+
+    def deliver(self, messages):
+        # Simula a entrega pelo XREADGROUP/XAUTOCLAIM
+        for message_id, _ in messages:
+            self.delivered[message_id] = self.delivered.get(message_id, 0) + 1
+        return messages
+
+    def xack(self, stream, group, *ids):
+        self.acked.extend(ids)
+
+    def xpending_range(self, stream, group, min, max, count):
+        times = self.delivered.get(min, self.deliveries)
+        return [{"message_id": min, "times_delivered": times}]
+
+    def xclaim(self, stream, group, consumer, min_idle_time, message_ids, retrycount=None, justid=False):
+        for message_id in message_ids:
+            self.delivered[message_id] = retrycount
+
+    def xadd(self, stream, fields, maxlen=None, approximate=True):
+        self.dead.append((stream, fields))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((getattr(self.client, name), args, kwargs))
+
+        return queue
+
+    def execute(self):
+        return [command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+def entry(path="/api/x"):
+    return {
+        "request_id": str(uuid.uuid4()),
+        "path": path,
+        "query_params": "",
+        "timestamp": datetime(2024, 5, 1, 12, 0, tzinfo=timezone.utc),
+    }
+
+
+@pytest.fixture
+def stream_redis():
+    client = redis.Redis.from_url(REDIS_URL, decode_responses=True, socket_timeout=0.5)
+    try:
+        client.ping()
+    except redis.RedisError:
+        pytest.skip(f"Redis indisponível em {REDIS_URL}")
+    stream = f"test:logs:{uuid.uuid4().hex}"
+    yield stream
+    client.delete(stream)
+
+
+def test_publisher_falls_back_to_opensearch_when_redis_is_down(fake_opensearch):
+    publisher = RedisStreamLogPublisher(
+        "redis://127.0.0.1:1/0", fallback_port=fake_opensearch, flush_interval=3600, timeout=0.2
+    )
+    publisher.publish(entry())
+    assert publisher.flush() == 1
+    index, documents = fake_opensearch.batches[0]
+    assert index == LOG_INDEX
+    assert documents[0]["timestamp"] == "2024-05-01T12:00:00+00:00"
+    assert documents[0]["nivel"] == "INFO"
+    assert "query_params" not in documents[0]
+    assert fake_opensearch.timestamp_fields == ["timestamp"]
+
+
+def test_log_transport_must_be_known(monkeypatch):
+    monkeypatch.setenv("LOG_TRANSPORT", "redis-stream")
+    with pytest.raises(ValidationError):
+        Settings()
+
+
+MESSAGES = [
+    ("1-0", {"data": '{"path": "/a"}'}),
+    ("2-0", {"data": '{"path": "/b"}'}),
+    ("3-0", {"data": '{"path": "/c"}'}),
+]
+
+
+def test_consumer_acks_each_message_that_is_done(fake_opensearch):
+    consumer = RedisStreamLogConsumer(REDIS_URL, fake_opensearch, max_deliveries=3)
+    consumer._redis = FakeStreamRedis()
+    fake_opensearch.reject = {1: 503, 2: 400}
+
+    # 1-0 indexado, 2-0 fica pendente, 3-0 rejeitado em definitivo
+    assert consumer.process(MESSAGES + [("4-0", {"data": "{quebrado"}), ("5-0", None)]) == 4
+    assert sorted(consumer._redis.acked) == ["1-0", "3-0", "4-0", "5-0"]
+    assert consumer.discarded == 2
+    assert [stream for stream, _ in consumer._redis.dead] == [consumer.dead_letter_stream]
+    fields = consumer._redis.dead[0][1]
+    assert fields["message_id"] == "3-0"
+    assert fields["reason"] == "rejeitado: 400"
+    assert json.loads(fields["data"]) == {"path": "/c"}
+    assert [d["_id"] for d in fake_opensearch.batches[0][1]] == ["1-0"]
+    assert fake_opensearch.timestamp_fields == ["timestamp"]
+
+
+def test_long_outage_dead_letters_nothing(fake_opensearch):
+    consumer = RedisStreamLogConsumer(
+        REDIS_URL, fake_opensearch, max_deliveries=3, backoff_seconds=0.01, max_backoff_seconds=0.04
+    )
+    consumer._redis = FakeStreamRedis()
+    fake_opensearch.unavailable = True
+    for _ in range(20):
+        assert consumer.process(consumer._redis.deliver(MESSAGES)) == 0
+        assert consumer.paused
+    assert consumer._redis.acked == []
+    assert consumer._redis.dead == []
+    assert consumer._redis.delivered == {"1-0": 0, "2-0": 0, "3-0": 0}
+    assert consumer._backoff == 0.04
+
+    # Depois da queda, uma falha do próprio documento ainda tem todas as tentativas
+    fake_opensearch.unavailable = False
+    fake_opensearch.reject = {0: 503}
+    assert consumer.process(consumer._redis.deliver(MESSAGES)) == 2
+    assert consumer._redis.dead == []
+    assert not consumer.paused
+
+
+def test_consumer_does_not_read_while_paused(fake_opensearch):
+    consumer = RedisStreamLogConsumer(REDIS_URL, fake_opensearch, backoff_seconds=0.05)
+    consumer._redis = FakeStreamRedis()
+    fake_opensearch.unavailable = True
+    reads = []
+
+    def poll():
+        reads.append(time.monotonic())
+        if len(reads) == 3:
+            consumer.stop()
+        return consumer.process(consumer._redis.deliver(MESSAGES))
+
+    consumer.ensure_group = lambda: None
+    consumer.reclaim = lambda: 0
+    consumer.poll = poll
+    consumer.run()
+    # Backoff de 0,05s e depois 0,1s entre as leituras
+    assert reads[1] - reads[0] >= 0.05
+    assert reads[2] - reads[1] >= 0.1
+
+
+def test_consumer_dead_letters_after_max_deliveries(fake_opensearch):
+    consumer = RedisStreamLogConsumer(REDIS_URL, fake_opensearch, max_deliveries=3)
+    consumer._redis = FakeStreamRedis(deliveries=3)
+    fake_opensearch.reject = {0: 503}
+    assert consumer.process(MESSAGES) == 3
+    assert sorted(consumer._redis.acked) == ["1-0", "2-0", "3-0"]
+    assert consumer._redis.dead[0][1]["reason"] == "3 entregas sem sucesso"
+    assert consumer.dead_lettered == 1
+
+
+def test_consumer_recreates_missing_group(fake_opensearch):
+    consumer = RedisStreamLogConsumer(REDIS_URL, fake_opensearch)
+    calls = []
+
+    def ensure_group():
+        calls.append("ensure_group")
+
+    def poll():
+        calls.append("poll")
+        if len(calls) == 2:
+            raise redis.ResponseError("NOGROUP No such key or consumer group")
+        consumer.stop()
+        return 0
+
+    consumer.ensure_group = ensure_group
+    consumer.poll = poll
+    consumer.reclaim = lambda: 0
+    consumer.run()
+    assert calls == ["ensure_group", "poll", "ensure_group", "poll"]
+
+
+def test_stream_round_trip_and_reclaim(stream_redis, fake_opensearch):
+    publisher = RedisStreamLogPublisher(REDIS_URL, stream=stream_redis, flush_interval=3600)
+    for i in range(5):
+        publisher.publish(entry(f"/api/{i}"))
+    assert publisher.flush() == 5
+
+    # Consumidor que lê com o OpenSearch fora e não dá ack
+    fake_opensearch.unavailable = True
+    crashed = RedisStreamLogConsumer(
+        REDIS_URL, fake_opensearch, stream=stream_redis, consumer="a", block_ms=0
+    )
+    crashed.ensure_group()
+    assert crashed.poll() == 0
+
+    fake_opensearch.unavailable = False
+    consumer = RedisStreamLogConsumer(
+        REDIS_URL, fake_opensearch, stream=stream_redis, consumer="b", block_ms=0, claim_idle_ms=1
+    )
+    consumer.ensure_group()
+    assert consumer.poll() == 0
+    time.sleep(0.01)
+    assert consumer.reclaim() == 5
+    paths = [d["path"] for _, batch in fake_opensearch.batches for d in batch]
+    assert paths == [f"/api/{i}" for i in range(5)]
+
+    client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    assert client.xpending(stream_redis, consumer.group)["pending"] == 0
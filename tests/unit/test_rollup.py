@@ -0,0 +1,129 @@
+import random
+import time
+
+from fastapi.testclient import TestClient
+
+from app.infrastructure.telemetry.rollup import ROLLUP_INDEX, RollupAggregator
+from app.infrastructure.telemetry.sketch import DDSketch
+
+
+def test_sketch_quantiles_within_relative_accuracy():
+    rng = random.Random(7)
+    values = sorted(rng.lognormvariate(3, 1) for _ in range(5000))
+    first, second = DDSketch(), DDSketch()
+    for i, value in enumerate(values):
+        (first if i % 2 else second).add(value)
+    first.merge(second)
+    restored = DDSketch.from_dict(first.to_dict())
+
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(restored.quantile(q) - exact) <= 0.01 * exact + 1e-9
+    assert restored.count == len(values)
+    assert restored.max == values[-1]
+    assert DDSketch().quantile(0.5) is None
+
+
+def test_flush_waits_for_the_grace_period(fake_opensearch):
+    rollup = RollupAggregator(fake_opensearch, flush_interval=3600, grace_seconds=3600)
+    minute = int(time.time() // 60) * 60 - 60
+    rollup.record("acme", "GET", "/items/{id}", 200, 0.010, 10, 100, timestamp=minute)
+    rollup.record("acme", "GET", "/items/{id}", 200, 0.030, 0, 100, timestamp=minute + 30)
+    rollup.record("acme", "GET", "/items/{id}", 500, 0.050, timestamp=minute + 59)
+
+    # Minuto anterior ainda dentro da tolerância para registros atrasados
+    assert rollup.flush() == 0
+    rollup.grace_seconds = 0
+    assert rollup.flush() == 2
+    index, documents = fake_opensearch.batches[0]
+    assert index == ROLLUP_INDEX
+    ok = next(d for d in documents if d["status"] == 200)
+    assert ok["count"] == 2
+    assert (ok["errors"], ok["bytes_in"], ok["bytes_out"]) == (0, 10, 200)
+    assert abs(ok["duration_ms"]["p50"] - 10) < 0.2
+    assert ok["duration_ms"]["max"] == 30
+    assert next(d for d in documents if d["status"] == 500)["errors"] == 1
+
+
+def test_late_records_get_a_fresh_document(fake_opensearch):
+    rollup = RollupAggregator(fake_opensearch, flush_interval=3600, grace_seconds=0)
+    rollup.record("acme", "GET", "/items/{id}", 500, 0.050, timestamp=0)
+    assert rollup.flush() == 1
+    rollup.record("acme", "GET", "/items/{id}", 500, 0.050, timestamp=1)
+    assert rollup.flush() == 1
+
+    first, late = (batch[0] for _, batch in fake_opensearch.batches)
+    assert first["timestamp"] == late["timestamp"] == "1970-01-01T00:00:00+00:00"
+    # Registro atrasado não sobrescreve o agregado já gravado
+    assert first["_id"] != late["_id"]
+    assert first["count"] == late["count"] == 1
+
+
+def test_failed_flush_retries_only_transient_rejections(fake_opensearch):
+    rollup = RollupAggregator(fake_opensearch, flush_interval=3600, grace_seconds=0)
+    rollup.record("acme", "GET", "/a", 200, 0.01, timestamp=0)
+    rollup.record("acme", "GET", "/b", 200, 0.01, timestamp=0)
+    rollup.record("acme", "GET", "/c", 200, 0.01, timestamp=0)
+
+    fake_opensearch.reject = {0: 429, 1: 400}
+    assert rollup.flush() == 1
+    assert rollup.failed == 1
+    fake_opensearch.reject = {}
+    fake_opensearch.unavailable = True
+    assert rollup.flush() == 0
+    fake_opensearch.unavailable = False
+    assert rollup.flush() == 1
+
+    routes = [[d["route"] for d in batch] for _, batch in fake_opensearch.batches]
+    assert routes == [["/c"], ["/a"]]
+
+
+def test_middleware_feeds_rollup_by_route_template(fake_app, fake_opensearch):
+    app = fake_app
+
+    @app.get("/api/items/{item_id}")
+    def item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    for item_id in (1, 2, 3):
+        client.get(f"/api/items/{item_id}", headers={"X-Tenant-ID": "acme"})
+    client.get("/actuator/health")
+
+    app.container.rollup_aggregator().shutdown()
+    documents = [d for _, batch in fake_opensearch.batches for d in batch]
+    assert len(documents) == 1
+    assert documents[0]["route"] == "/api/items/{item_id}"
+    assert documents[0]["tenant_id"] == "acme"
+    assert documents[0]["count"] == 3
+    assert documents[0]["bytes_out"] > 0
+
+
+def test_bulk_indexes_by_document_date(monkeypatch):
+    from opensearchpy import helpers
+
+    from app.infrastructure.adapters.opensearch_adapter import OpenSearchAdapter
+
+    adapter = OpenSearchAdapter()
+    created = []
+    monkeypatch.setattr(adapter, "create_index_if_not_exists", lambda name, mapping: created.append(name))
+
+    def streaming_bulk(client, actions, raise_on_error=True):
+        for action in actions:
+            if action["_source"]["status"] == 400:
+                yield False, {"index": {"_id": action.get("_id"), "status": 400}}
+            else:
+                yield True, {"index": {"_id": action.get("_id"), "status": 201}}
+
+    monkeypatch.setattr(helpers, "streaming_bulk", streaming_bulk)
+    result = adapter.bulk(
+        ROLLUP_INDEX,
+        [
+            {"_id": "a", "timestamp": "2024-05-01T23:59:00+00:00", "status": 200},
+            {"_id": "b", "timestamp": "2024-05-02T00:00:00+00:00", "status": 400},
+        ],
+        timestamp_field="timestamp",
+    )
+    assert created == ["logs_rollup_2024_05_01", "logs_rollup_2024_05_02"]
+    assert (result.indexed, result.rejected) == (1, {1: 400})
+    assert result.permanently_rejected(1) and not result.retryable(1)
@@ -0,0 +1,63 @@
+from fastapi.testclient import TestClient
+
+from app.main import create_app
+from app.middlewares.route_policy import (
+    DEFAULT_POLICY,
+    IGNORED,
+    ROUTE_POLICIES,
+    RoutePolicyTable,
+)
+
+
+def make_table():
+    return RoutePolicyTable().compile(
+        [
+            "/actuator/health",
+            "/docs",
+            "/admin/tenants/{tenant_id}",
+            "/api/items/{item_id}",
+            "/api/items/me",
+            "/api/files/{file_path:path}",
+        ]
+    )
+
+
+def test_prefixes_match_whole_segments():
+    table = make_table()
+    assert table.resolve("/actuator/health") is IGNORED
+    assert table.resolve("/docs/oauth2-redirect") is IGNORED
+    assert table.resolve("/config") is IGNORED
+    assert table.resolve("/config/theme") is IGNORED
+    assert table.resolve("/api/x/config/y") is DEFAULT_POLICY
+    assert table.resolve("/configuration") is DEFAULT_POLICY
+
+
+def test_route_templates_are_resolved_once():
+    table = make_table()
+    admin = ROUTE_POLICIES["/admin"]
+    assert table.templates["/admin/tenants/{tenant_id}"] is admin
+    assert table.resolve("/admin/tenants/42") is admin
+    assert table.resolve("/api/items/me") is DEFAULT_POLICY
+    assert table.resolve("/api/items/7") is DEFAULT_POLICY
+    assert table.resolve("/api/files/a/b/c.txt") is DEFAULT_POLICY
+
+
+def test_custom_policies_override_by_longest_prefix():
+    reports = IGNORED
+    table = RoutePolicyTable({"/api": DEFAULT_POLICY, "/api/reports": reports})
+    table.compile(["/api/reports/{report_id}", "/api/users"])
+    assert table.resolve("/api/reports/1") is reports
+    assert table.resolve("/api/users") is DEFAULT_POLICY
+
+
+def test_substring_no_longer_bypasses_tenant_check():
+    app = create_app("testing")
+
+    @app.get("/api/x/config/y")
+    def handler():
+        return {"ok": True}
+
+    with TestClient(app) as client:
+        assert "/api/x/config/y" in app.container.route_policies().templates
+        assert client.get("/api/x/config/y").status_code == 400
+        assert client.get("/actuator/health").status_code == 200
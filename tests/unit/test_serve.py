@@ -0,0 +1,100 @@
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+
+from app.interface.cli import serve
+from app.interface.cli.serve import Supervisor, available_cpus, build_config, describe
+
+
+def test_available_cpus_respects_cgroup_quota(tmp_path):
+    cpu_max = tmp_path / "cpu.max"
+    cpu_max.write_text("100000 100000\n")
+    assert available_cpus(str(cpu_max)) == 1
+
+    cpu_max.write_text("max 100000\n")
+    assert available_cpus(str(cpu_max)) == len(os.sched_getaffinity(0))
+
+
+def test_build_config_prefers_uvloop_and_httptools(monkeypatch):
+    monkeypatch.setattr(serve, "_installed", lambda module: True)
+    config = build_config(port=8123, workers=None, max_requests=500)
+    assert config.loop == "uvloop"
+    assert config.http == "httptools"
+    assert config.port == 8123
+    assert config.workers >= 1
+    assert config.max_requests == 500
+    assert "httptools" in describe(config)
+
+    monkeypatch.setattr(serve, "_installed", lambda module: False)
+    config = build_config()
+    assert (config.loop, config.http) == ("asyncio", "h11")
+
+
+def test_supervisor_gives_up_on_crash_loop(monkeypatch):
+    def broken_worker(config, app=None, sock=None):
+        raise ImportError("módulo quebrado")
+
+    monkeypatch.setattr(serve, "run_worker", broken_worker)
+    config = build_config(
+        workers=2,
+        reuse_port=True,
+        respawn_backoff=0.05,
+        crash_loop_limit=3,
+        min_worker_uptime=5,
+    )
+    supervisor = Supervisor(config)
+    spawned = []
+    spawn = supervisor._spawn
+
+    def counting_spawn():
+        spawned.append(time.monotonic())
+        spawn()
+
+    supervisor._spawn = counting_spawn
+    handlers = signal.getsignal(signal.SIGTERM), signal.getsignal(signal.SIGINT)
+    try:
+        assert supervisor.run() == 1
+    finally:
+        signal.signal(signal.SIGTERM, handlers[0])
+        signal.signal(signal.SIGINT, handlers[1])
+    assert supervisor.fast_failures == 3
+    assert len(spawned) <= 4
+    assert not supervisor.workers
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_serve_boots_workers_and_drains_on_sigterm():
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app", "serve", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", "2", "--graceful-timeout", "5"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/actuator/health")
+                break
+            except httpx.TransportError:
+                assert time.monotonic() < deadline, "servidor não subiu"
+                time.sleep(0.2)
+        assert response.json() == {"msg": "success"}
+    finally:
+        process.send_signal(signal.SIGTERM)
+        output, _ = process.communicate(timeout=30)
+
+    assert process.returncode == 0
+    assert "workers              2" in output
@@ -0,0 +1,26 @@
+import json
+import subprocess
+import sys
+
+from app.core.startup import import_report
+
+LAZY_MODULES = ["boto3", "opensearchpy", "keycloak", "slowapi", "psutil", "redis", "jwcrypto"]
+
+
+def test_import_does_not_load_adapters():
+    code = (
+        "import json, sys, app.main; "
+        f"print(json.dumps([m for m in {LAZY_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+def test_import_report_lists_app_imports_only():
+    report = import_report("app.main")
+    assert report["module"] == "app.main"
+    assert report["direct_imports"]
+    imported = {m["module"].split(".")[0] for m in report["slowest_modules"]}
+    assert not imported & set(LAZY_MODULES)
@@ -0,0 +1,69 @@
+import threading
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import Settings
+from app.infrastructure.telemetry.scheduler import (
+    PRIORITY_ALERT,
+    PRIORITY_LOG,
+    TelemetryScheduler,
+)
+
+
+def blocked_scheduler(**kwargs):
+    scheduler = TelemetryScheduler(workers=1, **kwargs)
+    release = threading.Event()
+    started = threading.Event()
+
+    def block():
+        started.set()
+        release.wait(5)
+
+    scheduler.submit(block)
+    started.wait(5)
+    return scheduler, release
+
+
+def test_alerts_run_before_logs():
+    scheduler, release = blocked_scheduler(max_queue=10)
+    executed = []
+    scheduler.submit(executed.append, "log", priority=PRIORITY_LOG)
+    scheduler.submit(executed.append, "alert", priority=PRIORITY_ALERT)
+    release.set()
+
+    assert scheduler.shutdown(timeout=5) == 0
+    assert executed == ["alert", "log"]
+
+
+def test_overflow_drops_logs_to_make_room_for_alerts():
+    scheduler, release = blocked_scheduler(max_queue=2, overflow_policy="drop_lowest")
+    executed = []
+    assert scheduler.submit(executed.append, "log-1")
+    assert scheduler.submit(executed.append, "log-2")
+    assert not scheduler.submit(executed.append, "log-3")
+    assert scheduler.submit(executed.append, "alert", priority=PRIORITY_ALERT)
+    release.set()
+    scheduler.shutdown(timeout=5)
+
+    assert executed == ["alert", "log-1"]
+    metrics = scheduler.metrics()
+    assert metrics["dropped"] == {"log": 2}
+    assert metrics["queue_max_depth"] == 2
+
+
+def test_shutdown_rejects_new_work_and_counts_failures():
+    scheduler = TelemetryScheduler(workers=2, max_queue=10)
+    scheduler.submit(lambda: 1 / 0)
+    scheduler.shutdown(timeout=5)
+
+    assert not scheduler.submit(print, "late")
+    assert scheduler.metrics()["failed"] == 1
+
+
+def test_unknown_overflow_policy_is_rejected(monkeypatch):
+    monkeypatch.setenv("TELEMETRY_OVERFLOW_POLICY", "drop-new")
+    with pytest.raises(ValidationError):
+        Settings()
+    with pytest.raises(ValueError):
+        TelemetryScheduler(overflow_policy="drop-new")
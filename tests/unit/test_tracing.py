@@ -0,0 +1,115 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.infrastructure.telemetry import tracing
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+def test_parse_traceparent():
+    assert tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (
+        TRACE_ID,
+        PARENT_ID,
+        True,
+    )
+    assert tracing.parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00")[2] is False
+    assert tracing.parse_traceparent(f"00-{'0' * 32}-{PARENT_ID}-01") is None
+    assert tracing.parse_traceparent("invalido") is None
+    assert tracing.parse_traceparent(None) is None
+
+
+def test_spans_propagate_trace_context():
+    trace = tracing.start_request_trace("GET /x", f"00-{TRACE_ID}-{PARENT_ID}-01")
+    try:
+        assert trace.root.parent_id == PARENT_ID
+        with tracing.span("http.get", tracing.KIND_CLIENT) as child:
+            headers = tracing.inject_headers({"Accept": "application/json"})
+        assert child.parent_id == trace.root.span_id
+        assert headers["traceparent"] == f"00-{TRACE_ID}-{child.span_id}-01"
+        assert headers["Accept"] == "application/json"
+    finally:
+        trace.finish()
+
+    assert tracing.current_span() is None
+    assert tracing.inject_headers() == {}
+    with tracing.span("fora_da_requisicao") as span:
+        assert span is None
+    durations = trace.phase_durations()
+    assert set(durations) == {"http.get", "total"}
+
+
+def test_server_timing_and_log_spans(monkeypatch, fake_app, fake_opensearch):
+    monkeypatch.setattr(settings, "TRACING_SERVER_TIMING", True)
+    app = fake_app
+
+    @app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    client = TestClient(app)
+    for _ in range(3):
+        response = client.get("/api/ping", headers={"X-Tenant-ID": "acme"})
+        assert response.status_code == 200
+
+    phases = dict(
+        item.split(";dur=") for item in response.headers["Server-Timing"].split(", ")
+    )
+    assert {"tenant", "redis_get", "body_capture", "rate_limit", "handler", "total"} <= set(phases)
+    assert float(phases["total"]) >= float(phases["handler"])
+
+    # O limite é registrado uma única vez, não a cada requisição
+    middleware = app.middleware_stack.app.app
+    assert sum(len(v) for v in middleware.limiter._route_limits.values()) == 1
+
+    app.container.telemetry_scheduler().shutdown()
+    assert len(fake_opensearch.documents) == 3
+    assert "handler" in fake_opensearch.documents[-1]["spans"]
+
+
+def test_exporter_writes_otlp_json(tmp_path, monkeypatch):
+    path = tmp_path / "spans.jsonl"
+    exporter = tracing.BatchSpanExporter(file_path=str(path), endpoint="")
+    monkeypatch.setattr(tracing, "exporter", exporter)
+
+    trace = tracing.start_request_trace("GET /x", f"00-{TRACE_ID}-{PARENT_ID}-01")
+    with tracing.span("redis.get", tracing.KIND_CLIENT, key="acme"):
+        pass
+    trace.finish()
+    exporter.shutdown()
+
+    payload = json.loads(path.read_text().splitlines()[0])
+    spans = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert [s["name"] for s in spans] == ["redis.get", "GET /x"]
+    assert {s["traceId"] for s in spans} == {TRACE_ID}
+    assert spans[1]["parentSpanId"] == PARENT_ID
+    assert spans[0]["parentSpanId"] == spans[1]["spanId"]
+    assert spans[0]["attributes"] == [{"key": "key", "value": {"stringValue": "acme"}}]
+    assert exporter.exported == 2
+
+
+def test_exporter_posts_outside_the_lock(monkeypatch):
+    import httpx
+
+    exporter = tracing.BatchSpanExporter(file_path="", endpoint="http://collector/v1/traces")
+    posts = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+    def post(url, **kwargs):
+        # Outro flush consegue retirar lotes enquanto o POST está em andamento
+        posts.append(exporter._lock.locked())
+        return Response()
+
+    monkeypatch.setattr(httpx, "post", post)
+    monkeypatch.setattr(tracing, "exporter", exporter)
+    trace = tracing.start_request_trace("GET /x")
+    trace.sampled = True
+    trace.finish()
+    exporter.flush()
+    assert posts == [False]
+    assert exporter.exported == 1
@@ -0,0 +1,140 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.infrastructure.telemetry.usage import UsageAccountant
+
+
+@pytest.fixture
+def hour():
+    # Início de uma janela de uma hora dentro da retenção
+    return int(time.time() // 3600) * 3600 - 7200
+
+
+def test_flush_batches_counters_into_time_buckets(fake_redis, hour):
+    usage = UsageAccountant(fake_redis, bucket_seconds=3600, flush_interval=3600)
+    usage.record("acme", 0.2, bytes_in=10, bytes_out=100, timestamp=hour)
+    usage.record("acme", 0.1, bytes_out=50, error=True, timestamp=hour + 100)
+    usage.record("globex", 0.1, timestamp=hour + 3700)
+
+    assert usage.flush() == 2
+    assert fake_redis.pipelines == 1
+    assert fake_redis.hashes[f"usage:acme:{hour}"]["requests"] == "2"
+    assert fake_redis.sets == {
+        f"usage-tenants:{hour}": {"acme"},
+        f"usage-tenants:{hour + 3600}": {"globex"},
+    }
+
+    totals = usage.totals(hour, hour + 3700)
+    assert totals["acme"]["requests"] == 2
+    assert totals["acme"]["errors"] == 1
+    assert totals["acme"]["bytes_out"] == 150
+    assert abs(totals["acme"]["wall_seconds"] - 0.3) < 1e-6
+    assert set(totals) == {"acme", "globex"}
+    assert set(usage.totals(hour, hour + 100)) == {"acme"}
+    assert set(usage.totals(hour - 86400, hour + 7200, tenant="globex")) == {"globex"}
+
+
+def test_totals_are_limited_to_retention(fake_redis, hour):
+    usage = UsageAccountant(fake_redis, bucket_seconds=3600, retention_days=1)
+    usage.record("acme", 0.1, timestamp=hour)
+    usage.flush()
+
+    assert set(usage.totals(hour - 3600, time.time() + 86400 * 365)) == {"acme"}
+    assert usage.totals(0, 3600) == {}
+    with pytest.raises(ValueError):
+        usage.totals(0, time.time())
+
+
+def test_cpu_time_is_apportioned_by_wall_time():
+    pending = {
+        ("a", 0): {"wall_us": 300, "cpu_us": 0},
+        ("b", 0): {"wall_us": 100, "cpu_us": 0},
+    }
+    UsageAccountant._apportion_cpu(pending, 1000)
+    assert pending[("a", 0)]["cpu_us"] == 750
+    assert pending[("b", 0)]["cpu_us"] == 250
+
+
+def test_failed_flush_keeps_counters_for_next_attempt(fake_redis, hour):
+    usage = UsageAccountant(fake_redis, flush_interval=3600)
+    usage.record("acme", 0.1, timestamp=hour)
+    fake_redis.down = True
+    assert usage.flush() == 0
+    usage.record("acme", 0.1, timestamp=hour)
+    fake_redis.down = False
+    usage.shutdown()
+    assert usage.totals(hour, hour)["acme"]["requests"] == 2
+
+
+def test_partial_failure_retries_only_rejected_groups(fake_redis, hour):
+    usage = UsageAccountant(fake_redis, bucket_seconds=3600, flush_interval=3600)
+    usage.record("acme", 0.1, timestamp=hour)
+    usage.record("globex", 0.1, timestamp=hour)
+    fake_redis.fail_keys = {f"usage:globex:{hour}", f"usage-tenants:{hour}"}
+    assert usage.flush() == 1
+    assert usage.failed_flushes == 1
+
+    fake_redis.fail_keys = set()
+    assert usage.flush() == 1
+    totals = usage.totals(hour, hour)
+    assert totals["acme"]["requests"] == 1
+    assert totals["globex"]["requests"] == 1
+    assert fake_redis.sets[f"usage-tenants:{hour}"] == {"acme", "globex"}
+
+
+def test_partial_failure_retries_only_rejected_fields(fake_redis, hour):
+    usage = UsageAccountant(fake_redis, bucket_seconds=3600, flush_interval=3600)
+    usage.record("acme", 0.1, bytes_out=100, timestamp=hour)
+    fake_redis.fail_fields = {(f"usage:acme:{hour}", "bytes_out")}
+    assert usage.flush() == 0
+
+    fake_redis.fail_fields = set()
+    usage.flush()
+    totals = usage.totals(hour, hour)["acme"]
+    assert totals["requests"] == 1
+    assert totals["bytes_out"] == 100
+
+
+def test_restored_counters_stay_out_of_the_cpu_split(fake_redis, hour, monkeypatch):
+    clock = iter([0.0, 1.0, 2.0])
+    monkeypatch.setattr(time, "process_time", lambda: next(clock))
+    usage = UsageAccountant(fake_redis, bucket_seconds=3600, flush_interval=3600)
+    usage.record("acme", 0.3, timestamp=hour)
+    fake_redis.down = True
+    usage.flush()
+
+    fake_redis.down = False
+    usage.record("globex", 0.1, timestamp=hour)
+    usage.flush()
+    totals = usage.totals(hour, hour)
+    # Cada intervalo de 1s de CPU vai para quem teve requisições nele
+    assert totals["acme"]["cpu_seconds"] == 1.0
+    assert totals["globex"]["cpu_seconds"] == 1.0
+
+
+def test_usage_endpoint_requires_actuator_token(monkeypatch, fake_app):
+    client = TestClient(fake_app)
+
+    monkeypatch.setattr(settings, "ACTUATOR_TOKEN", "")
+    assert client.get("/actuator/usage").status_code == 404
+
+    monkeypatch.setattr(settings, "ACTUATOR_TOKEN", "segredo")
+    assert client.get("/actuator/usage").status_code == 403
+    assert client.get("/actuator/usage", headers={"X-Actuator-Token": "x"}).status_code == 403
+
+    @fake_app.get("/api/ping")
+    def ping():
+        return {"ok": True}
+
+    client.get("/api/ping", headers={"X-Tenant-ID": "acme"})
+    fake_app.container.usage_accountant().flush()
+    headers = {"X-Actuator-Token": "segredo"}
+    response = client.get("/actuator/usage", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["tenants"]["acme"]["requests"] == 1
+
+    response = client.get("/actuator/usage", params={"start": 0}, headers=headers)
+    assert response.status_code == 400